@@ -0,0 +1,308 @@
+import argparse
+import multiprocessing
+import os
+import resource
+import shutil
+import tempfile
+import time
+
+import cv2
+import numpy as np
+import pytesseract
+from PIL import Image
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+from skimage.metrics import structural_similarity as ssim
+
+from slide_extractor import (DECODER_BACKENDS, FFmpegPipeDecoder, OpenCVDecoder, TesseractCLIEngine,
+                             TesserocrEngine, batch_ssim, tesserocr)
+from pdf_writer import PDF_PROFILES, SLIDE_PAGE_WIDTH, write_image_pdf, write_stacked_pdf
+
+
+def _new_stats():
+    return {"sampling": "", "frames_decoded": 0, "samples": 0, "decode_time": 0.0}
+
+
+def bench_decoders(video_path, interval, scale_width=None, repeat=3):
+    """Time every decoder backend sampling the same video"""
+    candidates = [
+        ("opencv/seek", lambda stats: OpenCVDecoder(video_path, interval, stats, sampling="seek")),
+        ("opencv/sequential", lambda stats: OpenCVDecoder(video_path, interval, stats, sampling="sequential")),
+        ("ffmpeg-pipe", lambda stats: FFmpegPipeDecoder(video_path, interval, stats)),
+    ]
+    if scale_width:
+        candidates.append((f"ffmpeg-pipe/{scale_width}w",
+                           lambda stats: FFmpegPipeDecoder(video_path, interval, stats, scale_width=scale_width)))
+
+    print(f"Decoding {video_path} every {interval}s ({', '.join(DECODER_BACKENDS)} backends)")
+    for label, make_decoder in candidates:
+        best = None
+        for _ in range(repeat):
+            stats = _new_stats()
+            decoder = make_decoder(stats)
+            if not decoder.open():
+                break
+            start = time.perf_counter()
+            try:
+                for _frame_num, frame in decoder.frames():
+                    frame.mean()  # touch the pixels like a comparison would
+            finally:
+                decoder.close()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        if best is None:
+            print(f"{label:>22}: unavailable")
+            continue
+        print(f"{label:>22}: {stats['samples']:5d} samples in {best:7.3f}s "
+              f"({stats['samples'] / best:8.1f} samples/s)")
+
+
+def _text_image():
+    """Thresholded synthetic slide with a few lines of text"""
+    image = np.full((720, 1280), 255, dtype=np.uint8)
+    for i, line in enumerate(["Benchmark slide", "Tesseract start-up cost", "versus persistent workers"]):
+        cv2.putText(image, line, (60, 150 + 120 * i), cv2.FONT_HERSHEY_SIMPLEX, 2.5, 0, 5)
+    return image
+
+
+def bench_ocr(image_path=None, calls=20, workers=1):
+    """Compare OCR calls per second of pytesseract's per-call fork against the OCR engines"""
+    if image_path:
+        gray = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+        _, image = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY)
+    else:
+        image = _text_image()
+
+    def run_pytesseract():
+        start = time.perf_counter()
+        for _ in range(calls):
+            pytesseract.image_to_string(Image.fromarray(image), config="--psm 6")
+        return time.perf_counter() - start
+
+    def run_engine(engine_class):
+        engine = engine_class(workers)
+        try:
+            engine.recognize(image)  # warm-up, includes loading traineddata
+            start = time.perf_counter()
+            jobs = [engine.submit(image) for _ in range(calls)]
+            for job in jobs:
+                job.result()
+            return time.perf_counter() - start
+        finally:
+            engine.close()
+
+    candidates = [("pytesseract (fork per call)", run_pytesseract),
+                  (f"cli engine x{workers}", lambda: run_engine(TesseractCLIEngine))]
+    if tesserocr is not None:
+        candidates.append((f"tesserocr engine x{workers}", lambda: run_engine(TesserocrEngine)))
+    else:
+        print("tesserocr is not installed, skipping the persistent engine")
+
+    print(f"OCR of a {image.shape[1]}x{image.shape[0]} image, {calls} calls")
+    for label, run in candidates:
+        try:
+            elapsed = run()
+        except Exception as e:
+            print(f"{label:>28}: failed ({e})")
+            continue
+        print(f"{label:>28}: {elapsed:7.3f}s ({calls / elapsed:6.1f} calls/s)")
+
+
+def _ssim_stack(width, height, count, seed=0):
+    """A synthetic slide and count noisy, slightly shifted copies of it"""
+    rng = np.random.default_rng(seed)
+    reference = cv2.resize(_text_image(), (width, height), interpolation=cv2.INTER_AREA)
+    frames = np.empty((count, height, width), dtype=np.uint8)
+    for i in range(count):
+        shifted = np.roll(reference, i % 5, axis=1).astype(np.int16)
+        frames[i] = np.clip(shifted + rng.integers(-20, 21, shifted.shape), 0, 255)
+    return reference, frames
+
+
+def bench_ssim(batch_sizes=(1, 4, 16, 64), width=320, repeat=3):
+    """Compare skimage's per-pair SSIM with the batched NumPy kernel"""
+    height = width * 9 // 16
+    print(f"SSIM of {width}x{height} frames against one reference")
+    for count in batch_sizes:
+        reference, frames = _ssim_stack(width, height, count)
+
+        def run_skimage():
+            return np.array([ssim(reference, frame) for frame in frames])
+
+        def run_batch():
+            return batch_ssim(reference, frames)
+
+        timings = {}
+        for label, run in (("skimage", run_skimage), ("batch", run_batch)):
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                scores = run()
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[label] = (best, scores)
+
+        (skimage_time, expected), (batch_time, scores) = timings["skimage"], timings["batch"]
+        print(f"batch of {count:4d}: skimage {count / skimage_time:8.1f} frames/s, "
+              f"batch {count / batch_time:8.1f} frames/s ({skimage_time / batch_time:4.1f}x), "
+              f"max score difference {np.abs(expected - scores).max():.1e}")
+
+
+def _pil_save_all(image_files, pdf_path):
+    """The original convert_slides_to_pdf: every page is decoded and held until save_all"""
+    images = [Image.open(path).convert("RGB") for path in image_files]
+    images[0].save(pdf_path, save_all=True, append_images=images[1:])
+
+
+def _reportlab_stacked(image_files, pdf_path):
+    """The original GUI generate_pdf: reportlab decodes and re-compresses every slide"""
+    c = canvas.Canvas(pdf_path, pagesize=letter)
+    y = 750
+    for path in image_files:
+        with Image.open(path) as img:
+            img_width, img_height = img.size
+        aspect_ratio = (img_height * 500) / img_width
+        c.drawImage(path, 50, y - aspect_ratio, width=500, height=aspect_ratio)
+        y -= (aspect_ratio + 50)
+        if y < 150:
+            c.showPage()
+            y = 750
+    c.save()
+
+
+def _pdf_writer_method(passthrough, stacked=False):
+    def run(image_files, pdf_path, dpi=None, workers=1, profile="archive", max_bytes=None):
+        settings = PDF_PROFILES[profile]
+        dpi = dpi or settings["dpi"]
+        options = {"jpeg_quality": settings["jpeg_quality"], "colors": settings["colors"], "max_bytes": max_bytes}
+        if stacked:
+            return write_stacked_pdf(image_files, pdf_path, passthrough, dpi, workers, **options)
+        return write_image_pdf(image_files, pdf_path, passthrough, dpi, SLIDE_PAGE_WIDTH if dpi else None, workers,
+                               **options)
+    return run
+
+
+PDF_METHODS = {
+    "pil-save-all": _pil_save_all,
+    "reportlab": _reportlab_stacked,
+    "streaming": _pdf_writer_method(passthrough=False),
+    "passthrough": _pdf_writer_method(passthrough=True),
+    "stacked-passthrough": _pdf_writer_method(passthrough=True, stacked=True),
+}
+# Builders on pdf_writer, which take the DPI and page preparation workers
+PDF_WRITER_METHODS = ("streaming", "passthrough", "stacked-passthrough")
+
+
+def _measure_pdf(method, options, image_files, pdf_path, results):
+    """Child process body: build one PDF and report (seconds, peak RSS in KiB)"""
+    start = time.perf_counter()
+    PDF_METHODS[method](image_files, pdf_path, **options)
+    results.put((time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+
+
+def _synthetic_deck(directory, count, width, image_format="png", repeat_every=0):
+    """Write count slides of the given width and format and return their paths.
+
+    With repeat_every, every repeat_every-th slide is a copy of the first one,
+    like an agenda slide shown again between Q&A sections.
+    """
+    height = width * 9 // 16
+    base = cv2.cvtColor(cv2.resize(_text_image(), (width, height), interpolation=cv2.INTER_AREA), cv2.COLOR_GRAY2BGR)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"slide_{i:04d}.{image_format}")
+        if repeat_every and i % repeat_every == repeat_every - 1:
+            shutil.copyfile(paths[0], path)
+            paths.append(path)
+            continue
+        slide = base.copy()
+        cv2.rectangle(slide, (0, 0), (width, height // 12), ((i * 37) % 256, (i * 91) % 256, 160), -1)
+        cv2.putText(slide, f"Slide {i + 1}", (width // 20, height - height // 10), cv2.FONT_HERSHEY_SIMPLEX,
+                    width / 640, (40, 40, 40), max(1, width // 640))
+        cv2.imwrite(path, slide)
+        paths.append(path)
+    return paths
+
+
+def bench_pdf(slide_counts=(100, 1000), width=1280, methods=tuple(PDF_METHODS), image_format="png",
+              dpi=None, workers=(1,), profile="archive", max_bytes=None, repeat_every=0):
+    """Time and peak memory of building a PDF from synthetic decks, each run in a fresh process"""
+    context = multiprocessing.get_context("spawn")
+    runs = []
+    for method in methods:
+        if method in PDF_WRITER_METHODS:
+            runs.extend((f"{method} x{count}", method,
+                         {"dpi": dpi, "workers": count, "profile": profile, "max_bytes": max_bytes})
+                        for count in workers)
+        else:
+            runs.append((method, method, {}))
+
+    with tempfile.TemporaryDirectory() as directory:
+        image_files = _synthetic_deck(directory, max(slide_counts), width, image_format, repeat_every)
+        print(f"PDF export of {width}px wide {image_format.upper()} slides, pdf_writer with the {profile} profile"
+              f"{f' at {dpi} dpi' if dpi else ''}{f' in {max_bytes / 1024 / 1024:.1f} MiB' if max_bytes else ''}"
+              f"{f', 1 in {repeat_every} slides repeated' if repeat_every else ''}")
+        for count in slide_counts:
+            for label, method, options in runs:
+                pdf_path = os.path.join(directory, f"{method}.pdf")
+                results = context.Queue()
+                process = context.Process(target=_measure_pdf,
+                                          args=(method, options, image_files[:count], pdf_path, results))
+                process.start()
+                process.join()
+                if process.exitcode != 0:
+                    print(f"{count:5d} slides {label:>22}: failed (exit code {process.exitcode})")
+                    continue
+                elapsed, peak_kib = results.get()
+                print(f"{count:5d} slides {label:>22}: {elapsed:7.2f}s, peak RSS {peak_kib / 1024:7.1f} MiB, "
+                      f"{os.path.getsize(pdf_path) / 1024 / 1024:7.1f} MiB PDF")
+                os.remove(pdf_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for the slide extractor")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    decoders = subparsers.add_parser("decoders", help="Compare frame decoder backends on one video")
+    decoders.add_argument("video", help="Local video file")
+    decoders.add_argument("--interval", type=float, default=5, help="Seconds between samples")
+    decoders.add_argument("--scale-width", type=int, default=None, help="Also time ffmpeg-pipe downscaled to this width")
+    decoders.add_argument("--repeat", type=int, default=3, help="Runs per backend, best time is reported")
+
+    ocr = subparsers.add_parser("ocr", help="Compare OCR calls per second across OCR engines")
+    ocr.add_argument("--image", default=None, help="Slide image to OCR (default: a synthetic text slide)")
+    ocr.add_argument("--calls", type=int, default=20, help="OCR calls per engine")
+    ocr.add_argument("--workers", type=int, default=1, help="Workers in the engine pools")
+
+    ssim_parser = subparsers.add_parser("ssim", help="Compare skimage SSIM with the batched NumPy kernel")
+    ssim_parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 16, 64], help="Frames per batch")
+    ssim_parser.add_argument("--width", type=int, default=320, help="Frame width, height follows 16:9")
+    ssim_parser.add_argument("--repeat", type=int, default=3, help="Runs per batch size, best time is reported")
+
+    pdf = subparsers.add_parser("pdf", help="Compare PDF export time and peak memory on synthetic decks")
+    pdf.add_argument("--slides", type=int, nargs="+", default=[100, 1000], help="Deck sizes to export")
+    pdf.add_argument("--width", type=int, default=1280, help="Slide width, height follows 16:9")
+    pdf.add_argument("--methods", nargs="+", choices=list(PDF_METHODS), default=list(PDF_METHODS),
+                     help="PDF builders to compare")
+    pdf.add_argument("--format", choices=["png", "jpg"], default="png", help="Image format of the synthetic slides")
+    pdf.add_argument("--dpi", type=int, default=None, help="Downscale pdf_writer pages to this resolution")
+    pdf.add_argument("--workers", type=int, nargs="+", default=[1], help="Page preparation threads to try")
+    pdf.add_argument("--profile", choices=list(PDF_PROFILES), default="archive", help="pdf_writer export profile")
+    pdf.add_argument("--max-mb", type=float, default=None, help="Size budget for pdf_writer PDFs in MiB")
+    pdf.add_argument("--repeat-every", type=int, default=0, help="Make every Nth slide a copy of the first one")
+
+    args = parser.parse_args()
+    if args.benchmark == "decoders":
+        bench_decoders(args.video, args.interval, args.scale_width, args.repeat)
+    elif args.benchmark == "ocr":
+        bench_ocr(args.image, args.calls, args.workers)
+    elif args.benchmark == "ssim":
+        bench_ssim(args.batch_sizes, args.width, args.repeat)
+    elif args.benchmark == "pdf":
+        bench_pdf(args.slides, args.width, args.methods, args.format, args.dpi, args.workers, args.profile,
+                  int(args.max_mb * 1024 * 1024) if args.max_mb else None, args.repeat_every)
+
+
+if __name__ == "__main__":
+    main()
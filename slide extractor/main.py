@@ -4,10 +4,8 @@ import tkinter as tk
 from tkinter import messagebox, filedialog, Label
 from tkinter.ttk import Progressbar, Style, Button, Entry
 import threading
-from slide_extractor import SlideExtractor
-from PIL import Image
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+from slide_extractor import SLIDE_EXTENSIONS, SlideExtractor
+from pdf_writer import write_stacked_pdf
 
 
 class SlideExtractorApp:
@@ -126,26 +124,13 @@ class SlideExtractorApp:
             return
 
         try:
-            slide_images = sorted(f for f in os.listdir(slide_folder) if f.endswith(".png"))
+            slide_images = sorted(f for f in os.listdir(slide_folder) if f.lower().endswith(SLIDE_EXTENSIONS))
             if not slide_images:
                 messagebox.showerror("No Slides", "No slides found. Please extract slides first.")
                 return
 
-            c = canvas.Canvas(pdf_filename, pagesize=letter)
-            y = 750
-            for slide in slide_images:
-                slide_path = os.path.join(slide_folder, slide)
-                img = Image.open(slide_path)
-                img_width, img_height = img.size
-                aspect_ratio = (img_height * 500) / img_width
-                c.drawImage(slide_path, 50, y - aspect_ratio, width=500, height=aspect_ratio)
-
-                y -= (aspect_ratio + 50)
-                if y < 150:
-                    c.showPage()
-                    y = 750
-
-            c.save()
+            write_stacked_pdf([os.path.join(slide_folder, slide) for slide in slide_images], pdf_filename,
+                              workers=os.cpu_count() or 1)
             messagebox.showinfo("Success", f"PDF generated successfully at:\n{pdf_filename}")
         except Exception as e:
             messagebox.showerror("Error", f"Error generating PDF: {str(e)}")
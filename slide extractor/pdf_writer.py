@@ -0,0 +1,434 @@
+import hashlib
+import io
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import cv2
+import numpy as np
+from PIL import Image
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# US Letter in points, the page the GUI stacks slides on
+LETTER = (612, 792)
+
+# Page width in points (10 inches) for slide pages rendered at a chosen DPI
+SLIDE_PAGE_WIDTH = 720
+
+# Export profiles: target resolution, the largest palette tried before a
+# photographic codec, and the JPEG quality for pages that need one
+PDF_PROFILES = {
+    "archive": {"dpi": None, "colors": None, "jpeg_quality": None},
+    "screen": {"dpi": 150, "colors": 256, "jpeg_quality": 80},
+    "mobile": {"dpi": 96, "colors": 16, "jpeg_quality": 60},
+}
+
+
+def _number(value):
+    """PDF number literal without trailing zeros"""
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+def encode_pixels(image, compression=6, jpeg_quality=None):
+    """add_image() arguments for a PIL image, Flate-compressed or, with a jpeg_quality, as a JPEG"""
+    if image.mode not in ("L", "RGB"):
+        image = image.convert("RGB")
+    width, height = image.size
+    color_space = "/DeviceGray" if image.mode == "L" else "/DeviceRGB"
+    if jpeg_quality:
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=jpeg_quality)
+        return {"data": buffer.getvalue(), "width": width, "height": height, "color_space": color_space,
+                "filter": "/DCTDecode"}
+    data = zlib.compress(image.tobytes(), compression)
+    return {"data": data, "width": width, "height": height, "color_space": color_space}
+
+
+def _pack_indices(indices, bits):
+    """Palette indices packed bits per pixel, each row padded to whole bytes"""
+    height, width = indices.shape
+    per_byte = 8 // bits
+    padded = np.pad(indices, ((0, 0), (0, -width % per_byte))).reshape(height, -1, per_byte)
+    shifts = np.arange(per_byte - 1, -1, -1, dtype=np.uint8) * bits
+    return np.bitwise_or.reduce(padded << shifts, axis=2).astype(np.uint8).tobytes()
+
+
+def encode_indexed(image, colors=256, max_error=2.0):
+    """add_image() arguments for an image as palette indices, None when colors colours are not enough.
+
+    Palettes of 2, 4 and 16 colours are tried before the full one, so
+    two-tone text pages end up at 1 bit per pixel. A palette is accepted
+    when the mean error per channel, estimated on every 4th pixel in both
+    directions, stays within max_error.
+    """
+    rgb = image.convert("RGB")
+    sample = np.asarray(rgb, dtype=np.int16)[::4, ::4]
+    for size in [n for n in (2, 4, 16) if n < colors] + [colors]:
+        quantized = rgb.quantize(size, method=Image.Quantize.FASTOCTREE)
+        indices = np.asarray(quantized)
+        count = int(indices.max()) + 1
+        palette = np.asarray(quantized.getpalette()[:3 * count], dtype=np.int16).reshape(-1, 3)
+        if np.abs(palette[indices[::4, ::4]] - sample).mean() > max_error:
+            continue
+        bits = next(bits for bits in (1, 2, 4, 8) if count <= 1 << bits)
+        lookup = palette.astype(np.uint8).tobytes().hex()
+        return {"data": zlib.compress(_pack_indices(indices, bits)), "width": rgb.width, "height": rgb.height,
+                "color_space": f"[/Indexed /DeviceRGB {count - 1} <{lookup}>]", "bits_per_component": bits}
+    return None
+
+
+def load_image(path, compression=6):
+    """Pixels of an image file as add_image() arguments, Flate-compressed 8-bit gray or RGB"""
+    with Image.open(path) as image:
+        return encode_pixels(image, compression)
+
+
+def _png_stream(data):
+    """add_image() arguments reusing a PNG's IDAT data as is, None when the PNG has to be decoded.
+
+    PNG compresses filtered scanlines with zlib, which is what a
+    FlateDecode stream with PNG predictors expects.
+    """
+    position = len(PNG_SIGNATURE)
+    header = palette = None
+    idat = []
+    while position + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[position:position + 8])
+        body = data[position + 8:position + 8 + length]
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", body)
+        elif kind == b"PLTE":
+            palette = body
+        elif kind == b"tRNS":
+            return None  # transparency would need a soft mask
+        elif kind == b"IDAT":
+            idat.append(body)
+        elif kind == b"IEND":
+            break
+        position += 12 + length
+
+    if header is None or not idat:
+        return None
+    width, height, depth, color_type, _, _, interlace = header
+    colors = {0: 1, 2: 3, 3: 1}.get(color_type)  # gray, RGB, palette; alpha types need decoding
+    if colors is None or interlace:
+        return None
+    if color_type == 3:
+        if palette is None:
+            return None
+        color_space = f"[/Indexed /DeviceRGB {len(palette) // 3 - 1} <{palette.hex()}>]"
+    else:
+        color_space = "/DeviceGray" if colors == 1 else "/DeviceRGB"
+    return {"data": b"".join(idat), "width": width, "height": height, "color_space": color_space,
+            "bits_per_component": depth, "filter": "/FlateDecode",
+            "decode_parms": f"<< /Predictor 15 /Colors {colors} /BitsPerComponent {depth} /Columns {width} >>"}
+
+
+def _jpeg_stream(path, data):
+    """add_image() arguments embedding a JPEG file as a DCTDecode stream, None for CMYK and other modes"""
+    with Image.open(path) as image:
+        if image.format != "JPEG" or image.mode not in ("L", "RGB"):
+            return None
+        width, height = image.size
+        color_space = "/DeviceGray" if image.mode == "L" else "/DeviceRGB"
+    return {"data": data, "width": width, "height": height, "color_space": color_space, "filter": "/DCTDecode"}
+
+
+def embed_image(path, passthrough=True):
+    """add_image() arguments for an image file, copying JPEG and PNG data without re-encoding when possible"""
+    if passthrough:
+        with open(path, "rb") as f:
+            data = f.read()
+        image = None
+        if data.startswith(PNG_SIGNATURE):
+            image = _png_stream(data)
+        elif data.startswith(b"\xff\xd8"):
+            image = _jpeg_stream(path, data)
+        if image is not None:
+            return image
+    return load_image(path)
+
+
+def _downscale(image, dpi, native_dpi):
+    if not dpi or dpi >= native_dpi:
+        return image
+    width = max(1, round(image.width * dpi / native_dpi))
+    size = (width, max(1, round(image.height * width / image.width)))
+    return Image.fromarray(cv2.resize(np.asarray(image), size, interpolation=cv2.INTER_AREA))
+
+
+def _budget_steps(dpi, jpeg_quality, budget):
+    """(dpi, [jpeg qualities]) from larger to smaller output; only the first step without a byte budget"""
+    if not budget:
+        return [(dpi, [jpeg_quality])]
+    quality = jpeg_quality or 85
+    qualities = sorted({quality, min(quality, 60), min(quality, 40)}, reverse=True)
+    steps = [(dpi * scale, qualities) for scale in (1, 0.75, 0.5, 0.35)]
+    if jpeg_quality is None:
+        steps[0] = (dpi, [None] + qualities)  # try lossless first
+    return steps
+
+
+def prepare_image(path, placed_width=None, dpi=None, passthrough=True, jpeg_quality=None, colors=None,
+                  max_bytes=None):
+    """Page image for path as (source size, add_image() arguments).
+
+    With a dpi, an image drawn placed_width points wide (default: its pixel
+    width) is downscaled to that resolution. With colors, pages that a
+    palette of at most that many colours reproduces are stored as palette
+    indices. Other pages use JPEG at jpeg_quality, or Flate without one
+    (JPEG sources stay JPEG). Images needing none of this are embedded as
+    they are. With max_bytes, lower resolutions and JPEG qualities are
+    tried in turn until the page image fits.
+    """
+    with Image.open(path) as image:
+        source_size = image.size
+        native_dpi = 72 * image.width / (placed_width or image.width)
+        if jpeg_quality is None and image.format == "JPEG":
+            jpeg_quality = 90
+        if not colors and (not dpi or dpi >= native_dpi):
+            encoded = embed_image(path, passthrough)
+            if not max_bytes or len(encoded["data"]) <= max_bytes:
+                return source_size, encoded
+
+        if image.mode not in ("L", "RGB"):
+            image = image.convert("RGB")
+        for step_dpi, qualities in _budget_steps(dpi or native_dpi, jpeg_quality, max_bytes):
+            page = _downscale(image, step_dpi, native_dpi)
+            # A page that fits a palette is stored that way whatever the JPEG quality
+            encoded = encode_indexed(page, colors) if colors else None
+            for quality in ([] if encoded else qualities):
+                encoded = encode_pixels(page, jpeg_quality=quality)
+                if not max_bytes or len(encoded["data"]) <= max_bytes:
+                    break
+            if not max_bytes or len(encoded["data"]) <= max_bytes:
+                break
+    return source_size, encoded
+
+
+def page_budget(max_bytes, pages):
+    """Image bytes each of pages may take for the document to stay within max_bytes"""
+    if not max_bytes:
+        return None
+    return max(1, (max_bytes - 1024) // max(1, pages) - 300)
+
+
+def file_digest(path):
+    """Content hash of a file, so identical slide files can share one image"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def prepare_pages(image_files, prepare, workers=1, max_in_flight=8, key=None):
+    """Yield (key, prepare(path)) for every file in order, preparing up to max_in_flight pages ahead on workers threads.
+
+    Decoding, resizing and compressing in PIL and zlib release the GIL, so
+    pages are prepared in parallel while the caller writes them one by one.
+    At most max_in_flight prepared pages are held in memory. With a key
+    function, a file whose key was already seen is not prepared again and
+    is yielded as (key, None).
+    """
+    seen = set()
+
+    def submit(path):
+        page_key = key(path) if key else None
+        if page_key is not None and page_key in seen:
+            return page_key, None
+        seen.add(page_key)
+        return page_key, prepare
+
+    if workers <= 1:
+        for path in image_files:
+            page_key, prepare_page = submit(path)
+            yield page_key, prepare_page(path) if prepare_page else None
+        return
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf-page")
+    pending = deque()
+    try:
+        for path in image_files:
+            page_key, prepare_page = submit(path)
+            pending.append((page_key, pool.submit(prepare_page, path) if prepare_page else None))
+            if len(pending) >= max(1, max_in_flight):
+                page_key, future = pending.popleft()
+                yield page_key, future.result() if future else None
+        while pending:
+            page_key, future = pending.popleft()
+            yield page_key, future.result() if future else None
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def page_images(pdf, image_files, prepare, workers=1, max_in_flight=8):
+    """Yield (source_size, image_id) for every file in order, adding each distinct image to pdf once.
+
+    Files with identical bytes are prepared once and every page showing them
+    references the same image XObject.
+    """
+    images = {}
+    for page_key, prepared in prepare_pages(image_files, prepare, workers, max_in_flight, key=file_digest):
+        if prepared is None:
+            pdf.shared_images += 1
+            yield images[page_key]
+            continue
+        source_size, image = prepared
+        images[page_key] = source_size, pdf.add_image(**image)
+        yield images[page_key]
+
+
+class PDFWriter:
+    """Write a PDF incrementally, one image and page at a time.
+
+    Every object goes to disk as soon as it is added, so memory holds only
+    the object offsets and page ids no matter how many pages there are. The
+    page tree, catalog and cross-reference table are written on close().
+    The file is written under a temporary name and renamed when complete.
+    Images are content-hashed, so an image added again reuses the object
+    already written instead of embedding the bytes a second time.
+    """
+
+    CATALOG_ID = 1
+    PAGES_ID = 2
+
+    def __init__(self, path):
+        self.path = path
+        self.temp_path = f"{path}.tmp"
+        self.file = open(self.temp_path, "wb")
+        self.offsets = {}
+        self.page_ids = []
+        self.image_ids = {}
+        self.shared_images = 0
+        self.next_id = 3
+        self.file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _reserve_id(self):
+        object_id = self.next_id
+        self.next_id += 1
+        return object_id
+
+    def _write_object(self, object_id, entries, stream=None):
+        """Write a dictionary object given its entries, followed by the stream data if any"""
+        self.offsets[object_id] = self.file.tell()
+        if stream is not None:
+            entries = f"{entries} /Length {len(stream)}".lstrip()
+        self.file.write(f"{object_id} 0 obj\n<< {entries} >>\n".encode())
+        if stream is not None:
+            self.file.write(b"stream\n")
+            self.file.write(stream)
+            self.file.write(b"\nendstream\n")
+        self.file.write(b"endobj\n")
+
+    def add_image(self, data, width, height, color_space="/DeviceRGB", bits_per_component=8,
+                  filter="/FlateDecode", decode_parms=None):
+        """Write an image XObject from already-encoded stream data and return its object id.
+
+        color_space, filter and decode_parms are PDF objects written as given.
+        An image identical to one already added returns the existing id.
+        """
+        parms = f" /DecodeParms {decode_parms}" if decode_parms else ""
+        entries = (f"/Type /XObject /Subtype /Image /Width {width} /Height {height} "
+                   f"/ColorSpace {color_space} /BitsPerComponent {bits_per_component} /Filter {filter}{parms}")
+        digest = hashlib.blake2b(entries.encode(), digest_size=16)
+        digest.update(data)
+        digest = digest.digest()
+        if digest in self.image_ids:
+            self.shared_images += 1
+            return self.image_ids[digest]
+
+        image_id = self._reserve_id()
+        self._write_object(image_id, entries, data)
+        self.image_ids[digest] = image_id
+        return image_id
+
+    def add_page(self, width, height, placements):
+        """Write a width x height point page drawing (image_id, x, y, w, h) placements"""
+        content = "".join(f"q {_number(w)} 0 0 {_number(h)} {_number(x)} {_number(y)} cm /Im{image_id} Do Q\n"
+                          for image_id, x, y, w, h in placements)
+        content_id = self._reserve_id()
+        self._write_object(content_id, "", content.encode())
+
+        xobjects = " ".join(f"/Im{image_id} {image_id} 0 R" for image_id in sorted({p[0] for p in placements}))
+        page_id = self._reserve_id()
+        self._write_object(page_id, f"/Type /Page /Parent {self.PAGES_ID} 0 R "
+                                    f"/MediaBox [0 0 {_number(width)} {_number(height)}] "
+                                    f"/Resources << /XObject << {xobjects} >> >> /Contents {content_id} 0 R")
+        self.page_ids.append(page_id)
+        return page_id
+
+    def close(self):
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self._write_object(self.PAGES_ID, f"/Type /Pages /Kids [{kids}] /Count {len(self.page_ids)}")
+        self._write_object(self.CATALOG_ID, f"/Type /Catalog /Pages {self.PAGES_ID} 0 R")
+
+        xref_offset = self.file.tell()
+        size = self.next_id
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        lines.extend(f"{self.offsets[object_id]:010d} 00000 n \n" if object_id in self.offsets
+                     else "0000000000 65535 f \n" for object_id in range(1, size))
+        lines.append(f"trailer\n<< /Size {size} /Root {self.CATALOG_ID} 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n")
+        self.file.write("".join(lines).encode())
+        self.file.close()
+        os.replace(self.temp_path, self.path)
+
+    def abort(self):
+        """Close and delete the partial file"""
+        self.file.close()
+        os.remove(self.temp_path)
+
+
+def write_image_pdf(image_files, pdf_path, passthrough=True, dpi=None, page_width=None, workers=1, max_in_flight=8,
+                    jpeg_quality=None, colors=None, max_bytes=None):
+    """Write one page per image, page_width points wide (default: the image at 72 dpi like PIL's save_all).
+
+    Returns the closed PDFWriter; shared_images counts pages that reused an image.
+    """
+    prepare = partial(prepare_image, placed_width=page_width, dpi=dpi, passthrough=passthrough,
+                      jpeg_quality=jpeg_quality, colors=colors, max_bytes=page_budget(max_bytes, len(image_files)))
+    with PDFWriter(pdf_path) as pdf:
+        for (source_width, source_height), image_id in page_images(pdf, image_files, prepare, workers, max_in_flight):
+            width = page_width or source_width
+            height = source_height * width / source_width
+            pdf.add_page(width, height, [(image_id, 0, 0, width, height)])
+    return pdf
+
+
+def write_stacked_pdf(image_files, pdf_path, passthrough=True, dpi=None, workers=1, max_in_flight=8,
+                      jpeg_quality=None, colors=None, max_bytes=None,
+                      page_size=LETTER, margin=50, image_width=500, top=750, bottom=150):
+    """Stack images image_width points wide down pages, starting a new page once below bottom.
+
+    Returns the closed PDFWriter; shared_images counts placements that reused an image.
+    """
+    prepare = partial(prepare_image, placed_width=image_width, dpi=dpi, passthrough=passthrough,
+                      jpeg_quality=jpeg_quality, colors=colors, max_bytes=page_budget(max_bytes, len(image_files)))
+    with PDFWriter(pdf_path) as pdf:
+        placements = []
+        y = top
+        for (source_width, source_height), image_id in page_images(pdf, image_files, prepare, workers, max_in_flight):
+            height = source_height * image_width / source_width
+            placements.append((image_id, margin, y - height, image_width, height))
+
+            y -= height + margin
+            if y < bottom:
+                pdf.add_page(*page_size, placements)
+                placements = []
+                y = top
+        if placements:
+            pdf.add_page(*page_size, placements)
+    return pdf
@@ -1,38 +1,1164 @@
 import os
+import re
+import json
+import shutil
+import hashlib
 import cv2
 import numpy as np
+import queue
 import subprocess
-from PIL import Image
+import tempfile
+import threading
+import time
 import pytesseract
 from datetime import timedelta
 import argparse
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from skimage.metrics import structural_similarity as ssim
+from pdf_writer import PDF_PROFILES, SLIDE_PAGE_WIDTH, write_image_pdf
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# Keyframe spacing assumed when ffprobe is unavailable (x264's default keyint)
+DEFAULT_KEYFRAME_INTERVAL = 250
+
+SAMPLING_MODES = ("auto", "seek", "sequential", "adaptive")
+DECODER_BACKENDS = ("opencv", "ffmpeg-pipe")
+OCR_ENGINES = ("auto", "cli", "tesserocr")
+COMPARATORS = ("skimage", "batch")
+
+# Slide image formats and their file extensions
+SLIDE_FORMATS = {"png": ".png", "webp": ".webp", "jpeg": ".jpg"}
+SLIDE_EXTENSIONS = tuple(SLIDE_FORMATS.values())
+
+# Codecs in rough order of how cheaply OpenCV's FFmpeg build decodes them
+CODEC_PREFERENCE = ("avc1", "h264", "vp9", "vp09", "hev1", "hvc1", "av01")
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "slide-extractor")
+DEFAULT_CACHE_SIZE = 10 * 1024 ** 3
+
+YOUTUBE_ID_PATTERN = re.compile(r"(?:v=|youtu\.be/|/shorts/|/embed/|/live/)([A-Za-z0-9_-]{11})")
+
+
+def probe_video(video_path):
+    """Return (fps, total_frames, width, height) of a video file"""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if not cap.isOpened():
+            return None
+        return (cap.get(cv2.CAP_PROP_FPS),
+                int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+                int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    finally:
+        cap.release()
+
+
+def dhash(frame, hash_size=8):
+    """Difference hash of a frame as a hash_size * hash_size bit integer"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming_distance(hash1, hash2):
+    return bin(hash1 ^ hash2).count("1")
+
+
+def box_mean(images, size=7):
+    """Mean of every size x size window over the last two axes, for windows fully inside the image.
+
+    Separable: the rows and then the columns are summed as size shifted
+    slices, which keeps float32 sums exact enough for 8-bit images.
+    """
+    height, width = images.shape[-2:]
+    rows = images[..., :height - size + 1, :].copy()
+    for k in range(1, size):
+        rows += images[..., k:height - size + 1 + k, :]
+    windows = rows[..., :width - size + 1].copy()
+    for k in range(1, size):
+        windows += rows[..., k:width - size + 1 + k]
+    windows *= np.float32(1.0 / (size * size))
+    return windows
+
+
+def ssim_stats(image, window=7):
+    """(float32 image, local mean, local variance) of an SSIM reference, reusable across batch_ssim calls"""
+    image = image.astype(np.float32)
+    cov_norm = np.float32(window * window / (window * window - 1))
+    mu = box_mean(image, window)
+    var = cov_norm * (box_mean(image * image, window) - mu * mu)
+    return image, mu, var
+
+
+def batch_ssim(reference, frames, window=7, data_range=255, reference_stats=None):
+    """Mean SSIM of each image in an N x H x W stack against one H x W reference.
+
+    Matches skimage's structural_similarity defaults (7x7 uniform window,
+    sample covariance, borders excluded) with every image scored in one
+    vectorised pass in float32. reference_stats from ssim_stats() skips
+    recomputing the reference's half of the work.
+    """
+    reference, mu_ref, var_ref = reference_stats or ssim_stats(reference, window)
+    frames = np.asarray(frames, dtype=np.float32)
+    cov_norm = np.float32(window * window / (window * window - 1))
+    c1 = np.float32((0.01 * data_range) ** 2)
+    c2 = np.float32((0.03 * data_range) ** 2)
+
+    mu = box_mean(frames, window)
+    var = cov_norm * (box_mean(frames * frames, window) - mu * mu)
+    cov = cov_norm * (box_mean(frames * reference, window) - mu * mu_ref)
+
+    numerator = (2 * mu * mu_ref + c1) * (2 * cov + c2)
+    denominator = (mu * mu + mu_ref * mu_ref + c1) * (var + var_ref + c2)
+    return (numerator / denominator).mean(axis=(1, 2))
+
+
+def frame_digest(frame):
+    """Content hash identifying a frame's exact pixels"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(frame.shape).encode())
+    digest.update(np.ascontiguousarray(frame).data)
+    return digest.digest()
+
+
+def image_to_string(image, config="--psm 6"):
+    """OCR a grayscale NumPy image without touching the disk.
+
+    The image is handed to tesseract's stdin as uncompressed PGM and the
+    text is read from its stdout, so concurrent calls never share a file.
+    """
+    ok, encoded = cv2.imencode(".pgm", image)
+    if not ok:
+        raise ValueError("Could not encode image for OCR")
+
+    command = [pytesseract.pytesseract.tesseract_cmd, "stdin", "stdout"] + config.split()
+    result = subprocess.run(command, input=encoded.tobytes(), capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode("utf-8", "replace").strip())
+    return result.stdout.decode("utf-8", "replace")
+
+
+def _codec_rank(vcodec):
+    for rank, prefix in enumerate(CODEC_PREFERENCE):
+        if vcodec.startswith(prefix):
+            return rank
+    return len(CODEC_PREFERENCE)
+
+
+def select_format(formats, min_height=720):
+    """Pick the cheapest yt-dlp format that still keeps slide text legible.
+
+    Prefers the lowest height of at least min_height (or the tallest one
+    below it), then video-only streams, then codecs OpenCV decodes quickly,
+    then the smallest file.
+    """
+    candidates = [f for f in formats if f.get("vcodec") not in (None, "none") and f.get("height")]
+    if not candidates:
+        return None
+
+    def sort_key(f):
+        legible = f["height"] >= min_height
+        return (
+            0 if legible else 1,
+            f["height"] if legible else -f["height"],
+            0 if f.get("acodec") == "none" else 1,
+            _codec_rank(f["vcodec"]),
+            f.get("filesize") or f.get("filesize_approx") or float("inf"),
+        )
+
+    return min(candidates, key=sort_key)
+
+
+def describe_format(f):
+    size = f.get("filesize") or f.get("filesize_approx")
+    size = f"{size / 1024 / 1024:.1f} MiB" if size else "unknown size"
+    audio = "video only" if f.get("acodec") == "none" else "with audio"
+    return f"{f['format_id']}: {f.get('width')}x{f['height']} {f['vcodec']}, {audio}, {size}"
+
+
+class OCREngine:
+    """Dispatches OCR jobs on thresholded grayscale images to a pool of workers"""
+    name = None
+
+    def __init__(self, workers=1, psm=6):
+        self.workers = workers
+        self.psm = psm
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"ocr-{self.name}")
+
+    def submit(self, image):
+        return self.executor.submit(self.recognize, image)
+
+    def recognize(self, image):
+        raise NotImplementedError
+
+    def close(self):
+        self.executor.shutdown()
+
+
+class TesseractCLIEngine(OCREngine):
+    """Starts a tesseract process for every image"""
+    name = "cli"
+
+    def recognize(self, image):
+        return image_to_string(image, config=f"--psm {self.psm}")
+
+
+class TesserocrEngine(OCREngine):
+    """Keeps one long-lived in-process Tesseract instance per worker.
+
+    The traineddata is loaded once per instance instead of once per image,
+    and tesserocr releases the GIL while recognising.
+    """
+    name = "tesserocr"
+
+    def __init__(self, workers=1, psm=6, lang="eng"):
+        super().__init__(workers, psm)
+        self.apis = queue.Queue()
+        for _ in range(workers):
+            self.apis.put(tesserocr.PyTessBaseAPI(lang=lang, psm=psm))
+
+    def recognize(self, image):
+        image = np.ascontiguousarray(image)
+        height, width = image.shape
+        api = self.apis.get()
+        try:
+            api.SetImageBytes(image.tobytes(), width, height, 1, width)
+            return api.GetUTF8Text()
+        finally:
+            self.apis.put(api)
+
+    def close(self):
+        super().close()
+        while not self.apis.empty():
+            self.apis.get().End()
+
+
+def create_ocr_engine(engine="auto", workers=1):
+    """Build an OCR engine, preferring persistent tesserocr workers when installed"""
+    if engine not in OCR_ENGINES:
+        raise ValueError(f"Unknown OCR engine: {engine}")
+    if engine == "tesserocr" and tesserocr is None:
+        raise ValueError("The tesserocr OCR engine needs the tesserocr package")
+
+    if engine != "cli" and tesserocr is not None:
+        return TesserocrEngine(workers)
+    return TesseractCLIEngine(workers)
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry and counts hits"""
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+
+class ReferenceFrame:
+    """The current slide's region with its grayscale levels and SSIM statistics, built once per slide"""
+
+    def __init__(self, frame, region):
+        self.frame = frame
+        self.region = region
+        self.gray = cv2.cvtColor(region, cv2.COLOR_BGR2GRAY)
+        self.hashes = {}
+        self.levels = {}
+        self.stats = {}
+
+    def hash(self, hash_size):
+        if hash_size not in self.hashes:
+            self.hashes[hash_size] = dhash(self.region, hash_size)
+        return self.hashes[hash_size]
+
+    def level(self, size):
+        """Grayscale region resized to size (width, height)"""
+        if size == self.gray.shape[::-1]:
+            return self.gray
+        if size not in self.levels:
+            self.levels[size] = cv2.resize(self.gray, size, interpolation=cv2.INTER_AREA)
+        return self.levels[size]
+
+    def ssim_stats(self, size):
+        if size not in self.stats:
+            self.stats[size] = ssim_stats(self.level(size))
+        return self.stats[size]
+
+
+class BKTree:
+    """Metric tree over integer hashes, searched by Hamming distance"""
+
+    def __init__(self):
+        self.root = None
+
+    def add(self, key, value):
+        node = (key, [value], {})
+        if self.root is None:
+            self.root = node
+            return
+        current = self.root
+        while True:
+            distance = hamming_distance(key, current[0])
+            if distance == 0:
+                current[1].append(value)
+                return
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def search(self, key, radius):
+        """Values whose key is within radius of key"""
+        found = []
+        pending = [self.root] if self.root else []
+        while pending:
+            node_key, values, children = pending.pop()
+            distance = hamming_distance(key, node_key)
+            if distance <= radius:
+                found.extend(values)
+            # Triangle inequality: only subtrees at distance +- radius can hold matches
+            pending.extend(child for edge, child in children.items() if abs(edge - distance) <= radius)
+        return found
+
+
+class SlideIndex:
+    """Descriptors of the saved slides, to recognise a slide shown again later in the video.
+
+    Candidates within max_distance of the slide's 64-bit dhash are confirmed
+    by SSIM between small thumbnails. The most recently recorded slide is
+    never a match, since detection already decided the frame differs from it.
+    """
+
+    def __init__(self, max_distance=10, min_similarity=0.95, thumbnail_size=(128, 72)):
+        self.max_distance = max_distance
+        self.min_similarity = min_similarity
+        self.thumbnail_size = thumbnail_size
+        self.tree = BKTree()
+        self.thumbnails = {}
+        self.last = None
+
+    def describe(self, region):
+        gray = cv2.cvtColor(region, cv2.COLOR_BGR2GRAY)
+        return dhash(region, 8), cv2.resize(gray, self.thumbnail_size, interpolation=cv2.INTER_AREA)
+
+    def add(self, path, region):
+        region_hash, thumbnail = self.describe(region)
+        self.tree.add(region_hash, path)
+        self.thumbnails[path] = thumbnail
+        self.last = path
+
+    def find(self, region):
+        """Path of an earlier slide showing the same content, or None"""
+        region_hash, thumbnail = self.describe(region)
+        candidates = [path for path in self.tree.search(region_hash, self.max_distance) if path != self.last]
+        if not candidates:
+            return None
+        scores = batch_ssim(thumbnail, np.stack([self.thumbnails[path] for path in candidates]))
+        best = int(np.argmax(scores))
+        return candidates[best] if scores[best] >= self.min_similarity else None
+
+    def __len__(self):
+        return len(self.thumbnails)
+
+
+def read_frame(video_path, frame_num):
+    """Decode a single frame by seeking to it"""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
+        ret, frame = cap.read()
+        return frame if ret else None
+    finally:
+        cap.release()
+
+
+def encode_image(frame, image_format="png", png_compression=3, jpeg_quality=95):
+    """Encode a BGR frame straight from its buffer with cv2.imencode"""
+    if image_format == "png":
+        params = [cv2.IMWRITE_PNG_COMPRESSION, png_compression]
+    elif image_format == "webp":
+        params = [cv2.IMWRITE_WEBP_QUALITY, 101]  # above 100 selects lossless WebP
+    elif image_format == "jpeg":
+        params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+    else:
+        raise ValueError(f"Unknown slide format: {image_format}")
+
+    ok, encoded = cv2.imencode(SLIDE_FORMATS[image_format], frame, params)
+    if not ok:
+        raise ValueError(f"Could not encode image as {image_format}")
+    return encoded
+
+
+def write_atomic(path, data):
+    """Write bytes to path so readers never see a partially written file"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+def video_cache_key(video_url, format_policy):
+    """Cache key built from the YouTube video id (or a hash of other URLs) and the format policy"""
+    match = YOUTUBE_ID_PATTERN.search(video_url)
+    video_id = match.group(1) if match else hashlib.sha1(video_url.encode()).hexdigest()[:16]
+    return f"{video_id}-{re.sub(r'[^A-Za-z0-9_.-]', '_', format_policy)}"
+
+
+class VideoCache:
+    """Downloaded videos shared between runs, evicted least recently used past max_bytes.
+
+    A video's modification time records its last use. A lock file per key
+    keeps concurrent runs from downloading the same video twice, and every
+    run using a video holds an in-use marker for it until it is done.
+    """
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_SIZE, stale_lock_seconds=6 * 3600):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.stale_lock_seconds = stale_lock_seconds
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.root, f"{key}.mp4")
+
+    @contextmanager
+    def lock(self, key, poll_interval=0.5):
+        """Hold the per-key lock, waiting for other runs and breaking locks left by dead ones"""
+        lock_path = os.path.join(self.root, f"{key}.lock")
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock_path) > self.stale_lock_seconds:
+                        os.remove(lock_path)
+                        continue
+                except OSError:
+                    continue
+                time.sleep(poll_interval)
+
+        try:
+            os.write(fd, str(os.getpid()).encode())
+            os.close(fd)
+            yield
+        finally:
+            os.remove(lock_path)
+
+    def touch(self, key):
+        os.utime(self.path(key))
+
+    def mark_in_use(self, key):
+        """Create a marker that keeps evict() away from the video until release() is called with it"""
+        fd, marker = tempfile.mkstemp(prefix=f"{key}.", suffix=".inuse", dir=self.root)
+        os.close(fd)
+        return marker
+
+    def release(self, marker):
+        if os.path.exists(marker):
+            os.remove(marker)
+
+    def _keys_in_use(self, names):
+        """Keys with a live in-use marker; markers left by dead runs are removed once stale"""
+        keys = set()
+        for name in names:
+            if not name.endswith(".inuse"):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                if time.time() - os.path.getmtime(path) > self.stale_lock_seconds:
+                    os.remove(path)
+                    continue
+            except OSError:
+                continue
+            keys.add(name.rsplit(".", 2)[0])
+        return keys
+
+    def evict(self, keep=None):
+        """Delete the least recently used videos until the cache fits in max_bytes.
+
+        Videos being downloaded or used by a run are kept, and partial
+        downloads (yt-dlp's .tmp.mp4.part files) left by failed runs are
+        removed.
+        """
+        names = os.listdir(self.root)
+        in_use = self._keys_in_use(names)
+        entries = []
+        for name in names:
+            path = os.path.join(self.root, name)
+            if ".tmp.mp4" in name:
+                key = name.split(".tmp.mp4")[0]
+                if not os.path.exists(os.path.join(self.root, f"{key}.lock")):
+                    size = os.path.getsize(path)
+                    os.remove(path)
+                    print(f"Removed partial download: {name} ({size / 1024 / 1024:.1f} MiB)")
+                continue
+            if not name.endswith(".mp4"):
+                continue
+            key = name[:-len(".mp4")]
+            entries.append((os.path.getmtime(path), os.path.getsize(path), key, path))
+
+        total = sum(size for _, size, _, _ in entries)
+        for _, size, key, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep or key in in_use or os.path.exists(os.path.join(self.root, f"{key}.lock")):
+                continue
+            os.remove(path)
+            total -= size
+            print(f"Evicted cached video: {key} ({size / 1024 / 1024:.1f} MiB)")
+
+
+def _largest_rectangle(mask):
+    """Largest all-True axis-aligned rectangle in a 2D bool array as (x, y, w, h)"""
+    best = (0, 0, 0, 0)
+    heights = np.zeros(mask.shape[1] + 1, dtype=int)
+    for row in range(mask.shape[0]):
+        heights[:-1] = np.where(mask[row], heights[:-1] + 1, 0)
+        stack = []
+        for col, height in enumerate(heights):
+            start = col
+            while stack and stack[-1][1] >= height:
+                start, top = stack.pop()
+                if top * (col - start) > best[2] * best[3]:
+                    best = (start, row - top + 1, col - start, top)
+            stack.append((start, height))
+    return best
+
+
+def detect_slide_roi(frame_pairs, black_level=24, motion_level=12, max_activity=0.15, grid=32, width=160):
+    """Find the stable slide rectangle from (frame, frame a moment later) pairs.
+
+    Black borders are the rows and columns that stay dark in every frame.
+    Inside them, grid cells that change within many pairs (a speaker camera,
+    say) are dropped, and the largest rectangle of the remaining cells is
+    returned as (x, y, w, h) in frame pixels. Returns None when the slide
+    fills the frame.
+    """
+    full_height, full_width = frame_pairs[0][0].shape[:2]
+    height = max(1, int(round(full_height * width / full_width)))
+
+    def small(frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, (width, height), interpolation=cv2.INTER_AREA)
+
+    pairs = [(small(a), small(b)) for a, b in frame_pairs]
+    brightest = np.max([np.maximum(a, b) for a, b in pairs], axis=0)
+    content = brightest > black_level
+    if not content.any():
+        return None
+    rows = np.flatnonzero(content.any(axis=1))
+    cols = np.flatnonzero(content.any(axis=0))
+
+    # Fraction of pairs in which each pixel changed
+    activity = np.mean([cv2.absdiff(a, b) > motion_level for a, b in pairs], axis=0).astype(np.float32)
+    grid_height = max(1, int(round(grid * height / width)))
+    cells = cv2.resize(activity, (grid, grid_height), interpolation=cv2.INTER_AREA) <= max_activity
+
+    cell_width, cell_height = width / grid, height / grid_height
+    cell_x = np.arange(grid) * cell_width
+    cell_y = np.arange(grid_height) * cell_height
+    cells &= ((cell_x >= cols[0] - cell_width / 2) & (cell_x + cell_width <= cols[-1] + 1 + cell_width / 2))[None, :]
+    cells &= ((cell_y >= rows[0] - cell_height / 2) & (cell_y + cell_height <= rows[-1] + 1 + cell_height / 2))[:, None]
+
+    gx, gy, gw, gh = _largest_rectangle(cells)
+    if not gw or not gh:
+        return None
+
+    # Snap the rectangle to the exact content edges where it reaches them
+    x0 = max(gx * cell_width, cols[0])
+    y0 = max(gy * cell_height, rows[0])
+    x1 = min((gx + gw) * cell_width, cols[-1] + 1)
+    y1 = min((gy + gh) * cell_height, rows[-1] + 1)
+
+    scale = full_width / width
+    x, y = int(round(x0 * scale)), int(round(y0 * scale))
+    w, h = int(round((x1 - x0) * scale)), int(round((y1 - y0) * scale))
+    if w * h >= 0.97 * full_width * full_height:
+        return None
+    return x, y, min(w, full_width - x), min(h, full_height - y)
+
+
+def sample_frame_pairs(video_path, count=24, gap_seconds=1.0):
+    """Frames a moment apart at evenly spaced points of the video"""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        gap = max(1, int(fps * gap_seconds))
+        pairs = []
+        for position in np.linspace(0, max(0, total_frames - gap - 1), count).astype(int):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+            ret1, frame1 = cap.read()
+            cap.set(cv2.CAP_PROP_POS_FRAMES, position + gap)
+            ret2, frame2 = cap.read()
+            if ret1 and ret2:
+                pairs.append((frame1, frame2))
+        return pairs
+    finally:
+        cap.release()
+
+
+class OpenCVDecoder:
+    """Sample frames with cv2.VideoCapture, seeking or decoding sequentially.
+
+    start_frame and end_frame restrict sampling to one segment of the video.
+    Samples always stay on the grid of multiples of the frame interval.
+    """
+    name = "opencv"
+    reuses_buffer = False
+
+    def __init__(self, video_path, interval, stats, sampling="auto", start_frame=0, end_frame=None):
+        self.video_path = video_path
+        self.interval = interval
+        self.stats = stats
+        self.sampling = sampling
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.cap = None
+        self.fps = 0
+        self.total_frames = 0
+        self.position = 0
+        self.keyframe_interval = None
+
+    def open(self):
+        self.cap = cv2.VideoCapture(self.video_path)
+        if not self.cap.isOpened():
+            print(f"Could not open video: {self.video_path}")
+            return False
+
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.frame_interval = max(1, int(self.fps * self.interval))
+        if self.end_frame is None or self.end_frame > self.total_frames:
+            self.end_frame = self.total_frames
+        self.sampling = self._choose_sampling()
+        self.stats["sampling"] = self.sampling
+        return True
+
+    def describe(self):
+        return f"{self.sampling} sampling"
+
+    def frames(self):
+        if self.sampling == "sequential":
+            return self._iter_frames_sequential()
+        return self._iter_frames_seek()
+
+    def close(self):
+        if self.cap is not None:
+            self.cap.release()
+        return True
+
+    def _choose_sampling(self):
+        """Pick seek or sequential sampling for the configured mode"""
+        if self.sampling != "auto":
+            return self.sampling
+
+        # Seeking re-decodes from the previous keyframe, so once samples are
+        # closer together than the keyframes it is cheaper to decode straight through.
+        return "sequential" if self.frame_interval <= self._keyframe_spacing() else "seek"
+
+    def _keyframe_spacing(self):
+        if self.keyframe_interval is None:
+            self.keyframe_interval = self._probe_keyframe_interval() or DEFAULT_KEYFRAME_INTERVAL
+        return self.keyframe_interval
+
+    def _probe_keyframe_interval(self):
+        """Estimate the keyframe spacing in frames from the first minute of packets"""
+        command = [
+            "ffprobe", "-v", "error",
+            "-select_streams", "v:0",
+            "-read_intervals", "%+60",
+            "-show_entries", "packet=pts_time,flags",
+            "-of", "csv=p=0",
+            self.video_path
+        ]
+        try:
+            result = subprocess.run(command, capture_output=True, text=True)
+        except OSError:
+            return None
+
+        if result.returncode != 0:
+            return None
+
+        keyframe_times = []
+        for line in result.stdout.splitlines():
+            pts_time, _, flags = line.partition(",")
+            if "K" in flags and pts_time not in ("", "N/A"):
+                keyframe_times.append(float(pts_time))
+
+        if len(keyframe_times) < 2:
+            return None
+        return max(1, int(round(np.median(np.diff(sorted(keyframe_times))) * self.fps)))
+
+    def read(self, frame_num):
+        """Decode one frame, grabbing forward from the current position when that beats a seek"""
+        t0 = time.perf_counter()
+        try:
+            gap = frame_num - self.position
+            if not 0 <= gap <= self._keyframe_spacing():
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
+                self.position = frame_num
+
+            while self.position < frame_num:
+                if not self.cap.grab():
+                    return None
+                self.position += 1
+                self.stats["frames_decoded"] += 1
+
+            ret, frame = self.cap.read()
+            if not ret:
+                return None
+            self.position += 1
+            self.stats["frames_decoded"] += 1
+            self.stats["samples"] += 1
+            return frame
+        finally:
+            self.stats["decode_time"] += time.perf_counter() - t0
+
+    def _iter_frames_seek(self):
+        """Yield (frame_num, frame) by seeking to every sample point"""
+        first_sample = -(-self.start_frame // self.frame_interval) * self.frame_interval
+        for frame_num in range(first_sample, self.end_frame, self.frame_interval):
+            t0 = time.perf_counter()
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
+            ret, frame = self.cap.read()
+            self.stats["decode_time"] += time.perf_counter() - t0
+
+            if not ret:
+                continue
+
+            self.stats["frames_decoded"] += 1
+            self.stats["samples"] += 1
+            yield frame_num, frame
+
+    def _iter_frames_sequential(self):
+        """Yield (frame_num, frame) decoding forward once, retrieving only sample points"""
+        frame_num = self.start_frame
+        if frame_num:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
+
+        while frame_num < self.end_frame:
+            t0 = time.perf_counter()
+            if not self.cap.grab():
+                break
+
+            frame = None
+            if frame_num % self.frame_interval == 0:
+                ret, frame = self.cap.retrieve()
+                if not ret:
+                    frame = None
+            self.stats["decode_time"] += time.perf_counter() - t0
+            self.stats["frames_decoded"] += 1
+
+            if frame is not None:
+                self.stats["samples"] += 1
+                yield frame_num, frame
+            frame_num += 1
+
+
+class FFmpegPipeDecoder:
+    """Sample frames with an ffmpeg subprocess streaming rawvideo over a pipe.
+
+    ffmpeg drops and scales frames inside the decoder, so only the sampled
+    frames cross the pipe. Samples are every frame_interval-th frame, the
+    same frames the opencv backend reads. Frames are read into one reusable
+    buffer and are only valid until the next frame is requested.
+
+    With time_grid, samples are instead the first frame at or after every
+    multiple of the interval, numbered from their timestamps (read back
+    from the showinfo filter along with the real frame rate). Streams use
+    it because the frame rate a site advertises is often rounded.
+
+    With keyframes_only, ffmpeg skips every non-key frame at the decoder
+    (-skip_frame nokey) and the interval is ignored. Their timestamps are
+    read back from the showinfo filter on stderr.
+
+    Instead of a file, ffmpeg can read the stdout of a source process (such
+    as a yt-dlp download); the (fps, total_frames, width, height) info must
+    then be given up front since the stream cannot be probed. Frames are
+    always scaled to that size so a stream of another size cannot misalign
+    the frame buffer.
+
+    start_frame seeks the file input first, keeping samples on the same
+    interval grid (and timestamps absolute) as a run from the beginning.
+    """
+    name = "ffmpeg-pipe"
+    reuses_buffer = True
+
+    def __init__(self, video_path, interval, stats, scale_width=None, keyframes_only=False, source=None, info=None,
+                 start_frame=0, time_grid=False):
+        self.video_path = video_path
+        self.time_grid = time_grid and not keyframes_only
+        self.start_frame = start_frame
+        self.interval = interval
+        self.stats = stats
+        self.scale_width = scale_width
+        self.keyframes_only = keyframes_only
+        self.source = source
+        self.info = info
+        self.process = None
+        self.timestamps = queue.Queue()
+        self.fps = 0
+        self.total_frames = 0
+        self.finished = False
+        self.stderr_readers = []
+        # Last lines of ffmpeg's and the source's stderr, shown if either fails
+        self.errors = {"ffmpeg": deque(maxlen=20), "source": deque(maxlen=20)}
+
+    def open(self):
+        info = self.info or probe_video(self.video_path)
+        if info is None:
+            print(f"Could not open video: {self.video_path}")
+            return False
+
+        self.fps, self.total_frames, width, height = info
+        if self.scale_width and self.scale_width < width:
+            # libx264-style even dimensions keep every pixel format happy
+            self.width = self.scale_width - self.scale_width % 2
+            self.height = max(2, int(round(height * self.width / width / 2)) * 2)
+        else:
+            self.width, self.height = width, height
+
+        if self.keyframes_only:
+            self.start_time = self.start_frame / self.fps
+        elif self.time_grid:
+            # The next multiple of the interval after the sample before start_frame
+            self.first_index = int(np.floor((self.start_frame - 0.5) / self.fps / self.interval)) + 1
+            # Timestamps stay absolute (-copyts), so a second's head start is simply not selected
+            self.start_time = max(0.0, self.first_index * self.interval - 1)
+        else:
+            # The same frame grid the opencv backend samples
+            self.frame_interval = max(1, int(self.fps * self.interval))
+            self.first_frame = -(-self.start_frame // self.frame_interval) * self.frame_interval
+            # Seek half a frame early so the first sample is the first frame decoded
+            self.start_time = max(0.0, (self.first_frame - 0.5) / self.fps)
+
+        reads_timestamps = self.keyframes_only or self.time_grid
+        command = ["ffmpeg", "-v", "info" if reads_timestamps else "error", "-nostdin"]
+        if self.keyframes_only:
+            command += ["-skip_frame", "nokey"]
+        if self.start_time and not self.source:
+            command += ["-ss", f"{self.start_time:.6f}"]
+        if self.time_grid:
+            command += ["-copyts"]
+        command += ["-i", "pipe:0" if self.source else self.video_path, "-an", "-sn", "-vf", self._filters(),
+                    "-fps_mode", "passthrough", "-f", "rawvideo", "-pix_fmt", "bgr24", "pipe:1"]
+
+        stdin = self.source.stdout if self.source else subprocess.DEVNULL
+        try:
+            self.process = subprocess.Popen(command, stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except OSError as e:
+            print(f"Error starting ffmpeg: {e}")
+            return False
+        if self.source:
+            # ffmpeg owns the read end now, so the source sees a broken pipe if ffmpeg exits
+            self.source.stdout.close()
+
+        self._read_stderr(self.process.stderr, self.errors["ffmpeg"], reads_timestamps)
+        if self.source and self.source.stderr:
+            self._read_stderr(self.source.stderr, self.errors["source"])
+        self.stats["sampling"] = "keyframes" if self.keyframes_only else self.name
+        return True
+
+    def _filters(self):
+        # Selecting by frame count keeps the samples exactly on frame_interval multiples;
+        # the fps filter would pick the last frame of a time bucket instead
+        if self.keyframes_only:
+            filters = ["showinfo"]
+        elif self.time_grid:
+            interval = self.interval
+            filters = [f"select=gt(floor(t/{interval})\\,"
+                       f"if(isnan(prev_t)\\,{self.first_index - 1}\\,floor(prev_t/{interval}))),showinfo"]
+        else:
+            filters = [f"select=not(mod(n\\,{self.frame_interval}))"]
+        if self.scale_width or self.source:
+            filters.append(f"scale={self.width}:{self.height}:flags=area")
+        return ",".join(filters)
+
+    def _read_stderr(self, stream, lines, timestamps=False):
+        """Keep the last lines of a process's stderr on a background thread.
+
+        With timestamps, the pts_time of every frame that passes the
+        showinfo filter is collected instead of being kept, and the frame
+        rate showinfo reports replaces the probed one.
+        """
+        def read():
+            for line in stream:
+                line = line.decode("utf-8", "replace").rstrip()
+                if timestamps and "showinfo" in line:
+                    match = re.search(r"pts_time:\s*(\S+)", line)
+                    if match:
+                        self.timestamps.put(float(match.group(1)))
+                    rate = re.search(r"config in .*frame_rate: (\d+)/(\d+)", line)
+                    if rate and int(rate.group(1)) and int(rate.group(2)):
+                        # Reported before the first frame, so every frame number uses it
+                        self.fps = int(rate.group(1)) / int(rate.group(2))
+                elif line:
+                    lines.append(line)
+            if timestamps:
+                self.timestamps.put(None)
+
+        reader = threading.Thread(target=read, daemon=True)
+        reader.start()
+        self.stderr_readers.append(reader)
+
+    def _frame_number(self, index):
+        if not self.keyframes_only and not self.time_grid:
+            return self.first_frame + index * self.frame_interval
+
+        try:
+            pts_time = self.timestamps.get(timeout=30)
+        except queue.Empty:
+            pts_time = None
+        if pts_time is None:
+            raise RuntimeError("ffmpeg stopped reporting frame timestamps")
+        if self.time_grid:
+            return int(round(pts_time * self.fps))
+        return int(round((self.start_time + pts_time) * self.fps))
+
+    def describe(self):
+        mode = "keyframe-only " if self.keyframes_only else ""
+        return f"{mode}{self.name} decoding at {self.width}x{self.height}"
+
+    def frames(self):
+        frame_size = self.width * self.height * 3
+        buffer = bytearray(frame_size)
+        view = memoryview(buffer)
+        frame = np.frombuffer(buffer, dtype=np.uint8).reshape(self.height, self.width, 3)
+
+        index = 0
+        while True:
+            t0 = time.perf_counter()
+            if not self._read_into(view, frame_size):
+                self.finished = True
+                break
+            self.stats["decode_time"] += time.perf_counter() - t0
+            self.stats["frames_decoded"] += 1
+            self.stats["samples"] += 1
+
+            yield self._frame_number(index), frame
+            index += 1
+
+    def _read_into(self, view, frame_size):
+        received = 0
+        while received < frame_size:
+            n = self.process.stdout.readinto(view[received:])
+            if not n:
+                return False
+            received += n
+        return True
+
+    def close(self):
+        """Stop ffmpeg and the source process; False if either of them failed.
+
+        After the last frame both are waited for and their exit status is
+        checked, so a read error or failed download is not mistaken for the
+        end of the video. Processes stopped early are not errors.
+        """
+        ok = True
+        if self.process is not None:
+            self.process.stdout.close()
+            stopped = not self.finished and self.process.poll() is None
+            if stopped:
+                self.process.kill()
+            self.process.wait()
+            ok = stopped or self.process.returncode == 0
+        if self.source is not None:
+            stopped = not ok or (not self.finished and self.source.poll() is None)
+            if stopped and self.source.poll() is None:
+                self.source.kill()
+            self.source.wait()
+            source_ok = stopped or self.source.returncode == 0
+        for reader in self.stderr_readers:
+            reader.join(timeout=5)
+
+        if self.source is not None and not source_ok:
+            print(f"yt-dlp exited with status {self.source.returncode}:\n" + "\n".join(self.errors["source"]))
+        if not ok:
+            print(f"ffmpeg exited with status {self.process.returncode}:\n" + "\n".join(self.errors["ffmpeg"]))
+        return ok and (self.source is None or source_ok)
+
 
 class SlideExtractor:
-    def __init__(self, video_url, output_dir="slides", interval=5, similarity_threshold=0.9, ocr_confidence=30):
+    def __init__(self, video_url, output_dir="slides", interval=5, similarity_threshold=0.9, ocr_confidence=30,
+                 sampling="auto", backend="opencv", scale_width=None, keyframes_only=False,
+                 proxy_width=320, ssim_band=0.05, hash_size=8, hash_same_distance=0, hash_diff_distance=None,
+                 ocr_cache_size=32, ocr_engine="auto", ocr_workers=2, jobs=1,
+                 pipeline=False, queue_depth=8, writer_threads=2,
+                 slide_format="png", png_compression=3, jpeg_quality=95, stream=False, min_height=720,
+                 cache_dir=DEFAULT_CACHE_DIR, cache_size=DEFAULT_CACHE_SIZE, checkpoint_interval=30, resume=False,
+                 max_interval=60, roi=None, crop_slides=False, comparator="skimage", batch_size=16,
+                 dedupe=False, dedupe_distance=10, dedupe_similarity=0.95,
+                 pdf_dpi=None, pdf_workers=1, pdf_in_flight=8, pdf_profile="archive", pdf_max_bytes=None):
+        if sampling not in SAMPLING_MODES:
+            raise ValueError(f"Unknown sampling mode: {sampling}")
+        if backend not in DECODER_BACKENDS:
+            raise ValueError(f"Unknown decoder backend: {backend}")
+        if slide_format not in SLIDE_FORMATS:
+            raise ValueError(f"Unknown slide format: {slide_format}")
+        if comparator not in COMPARATORS:
+            raise ValueError(f"Unknown comparator: {comparator}")
+        if pdf_profile not in PDF_PROFILES:
+            raise ValueError(f"Unknown PDF profile: {pdf_profile}")
+        if scale_width and not (backend == "ffmpeg-pipe" or stream or keyframes_only):
+            raise ValueError("Scaling while decoding (scale_width) needs the ffmpeg-pipe backend, "
+                             "streaming or keyframes_only")
+        if jobs > 1 and (backend != "opencv" or keyframes_only or stream):
+            raise ValueError("Parallel extraction needs the opencv backend and a downloaded video")
+        if jobs > 1 and resume:
+            raise ValueError("Resuming from a checkpoint needs a serial run")
+        if sampling == "adaptive" and (backend != "opencv" or keyframes_only or stream or jobs > 1):
+            raise ValueError("Adaptive sampling needs a serial run on the opencv backend")
+        if comparator == "batch" and (pipeline or sampling == "adaptive"):
+            raise ValueError("The batch comparator scores frames in the plain serial loop, "
+                             "not with --pipeline or adaptive sampling")
+
         self.video_url = video_url
         self.output_dir = output_dir
         self.interval = interval
         self.similarity_threshold = similarity_threshold
         self.ocr_confidence = ocr_confidence
+        self.sampling = sampling
+        self.backend = backend
+        self.scale_width = scale_width
+        self.keyframes_only = keyframes_only
+        self.proxy_width = proxy_width
+        self.ssim_band = ssim_band
+        self.hash_size = hash_size
+        self.hash_same_distance = hash_same_distance
+        self.hash_diff_distance = hash_diff_distance if hash_diff_distance is not None else hash_size * hash_size // 4
+        self.ocr_cache_size = ocr_cache_size
+        self.ocr_cache = LRUCache(ocr_cache_size)
+        self.ocr_engine_name = ocr_engine
+        self.ocr_workers = ocr_workers
+        self.ocr_engine = None
+        self.jobs = jobs
+        self.pipeline = pipeline
+        self.queue_depth = queue_depth
+        self.writer_threads = writer_threads
+        self.slide_format = slide_format
+        self.png_compression = png_compression
+        self.jpeg_quality = jpeg_quality
+        self.stream = stream
+        self.min_height = min_height
+        self.selected_format = None
+        self.video_duration = None
+        self.format_spec = None
+        self.cache = VideoCache(cache_dir, cache_size) if cache_dir else None
+        self._video_marker = None
+        self.checkpoint_interval = checkpoint_interval
+        self.resume = resume
+        self.max_interval = max_interval
+        self.roi = roi
+        self.crop_slides = crop_slides
+        self.comparator = comparator
+        self.batch_size = max(1, batch_size)
+        self.dedupe = dedupe
+        self.dedupe_distance = dedupe_distance
+        self.dedupe_similarity = dedupe_similarity
+        self.slide_index = None
+        self.pdf_dpi = pdf_dpi
+        self.pdf_workers = pdf_workers
+        self.pdf_in_flight = pdf_in_flight
+        self.pdf_profile = pdf_profile
+        self.pdf_max_bytes = pdf_max_bytes
+        self.roi_box = tuple(roi) if roi not in (None, "auto") else None
+        self._roi_source_size = None
+        self._roi_crops = {}
+        self._reference = None
+        self.checkpoint_path = os.path.join(self.output_dir, ".checkpoint.json")
+        self.reference_path = os.path.join(self.output_dir, ".checkpoint_reference.npy")
+        self.manifest_path = os.path.join(self.output_dir, "slides.json")
+        self._last_checkpoint = 0.0
+        self._checkpointed_reference = None
+        self.log_saves = True
         self.video_path = os.path.join(self.output_dir, "temp_video.mp4")
         self.previous_text = ""
+        self.stats = {}
+        # Guards the stats updated from writer threads
+        self._stats_lock = threading.Lock()
 
         os.makedirs(self.output_dir, exist_ok=True)
 
-    def download_video(self):
-        """Download the YouTube video using yt-dlp"""
+    def __getstate__(self):
+        # Parallel workers get a pickled copy; the lock is recreated on their side
+        state = self.__dict__.copy()
+        del state["_stats_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._stats_lock = threading.Lock()
+
+    def _format_args(self):
+        if self.format_spec is None:
+            self.format_spec = self._select_format() or "best[ext=mp4]"
+        return ["-f", self.format_spec]
+
+    def _select_format(self):
+        """Choose a format id from yt-dlp's format list, None to fall back to best[ext=mp4]"""
+        if not self.min_height:
+            return None
+
+        try:
+            command = ["yt-dlp", "-J", "--no-playlist", self.video_url]
+            result = subprocess.run(command, capture_output=True, text=True)
+            if result.returncode != 0:
+                print(f"yt-dlp error:\n{result.stderr}")
+                return None
+            info = json.loads(result.stdout)
+        except (OSError, ValueError) as e:
+            print(f"Could not list video formats: {e}")
+            return None
+
+        chosen = select_format(info.get("formats") or [], self.min_height)
+        if chosen is None:
+            return None
+
+        self.selected_format = chosen
+        self.video_duration = info.get("duration")
+        print(f"Selected format {describe_format(chosen)}")
+        return chosen["format_id"]
+
+    def _download_command(self, output):
+        return ["yt-dlp"] + self._format_args() + ["-o", output, self.video_url]
+
+    def download_video(self, path=None, final_path=None):
+        """Download the YouTube video using yt-dlp.
+
+        final_path is where the caller moves the file afterwards, reported instead of path.
+        """
+        path = path or self.video_path
         try:
-            command = [
-                "yt-dlp",
-                "-f", "best[ext=mp4]",
-                "-o", self.video_path,
-                self.video_url
-            ]
+            command = self._download_command(path)
             result = subprocess.run(command, capture_output=True, text=True)
 
             if result.returncode == 0:
-                print(f"Video downloaded to: {self.video_path}")
+                size = os.path.getsize(path) / 1024 / 1024
+                print(f"Video downloaded to: {final_path or path} ({size:.1f} MiB, format {self.format_spec})")
                 return True
             else:
                 print(f"yt-dlp error:\n{result.stderr}")
@@ -41,59 +1167,749 @@ class SlideExtractor:
             print(f"Error downloading video: {e}")
             return False
 
+    def _format_policy(self):
+        return f"min{self.min_height}p" if self.min_height else "best-mp4"
+
+    def fetch_video(self):
+        """Point video_path at a local copy of the video, downloading it through the cache if needed"""
+        if os.path.exists(self.video_path):
+            return True
+        if self.cache is None:
+            return self.download_video()
+
+        key = video_cache_key(self.video_url, self._format_policy())
+        cached_path = self.cache.path(key)
+        with self.cache.lock(key):
+            if os.path.exists(cached_path):
+                self.cache.touch(key)
+                print(f"Using cached video: {cached_path}")
+            else:
+                partial_path = os.path.join(self.cache.root, f"{key}.tmp.mp4")
+                if not self.download_video(partial_path, cached_path):
+                    return False
+                os.replace(partial_path, cached_path)
+            self.video_path = cached_path
+            # Marked before the lock is released so no other run can evict it in between
+            self._video_marker = self.cache.mark_in_use(key)
+
+        self.cache.evict(keep=key)
+        return True
+
+    def release_video(self):
+        """Let other runs evict the cached video again"""
+        if self._video_marker:
+            self.cache.release(self._video_marker)
+            self._video_marker = None
+
+    def _cached_video_path(self):
+        """Path of an already cached copy of the video, if any"""
+        if self.cache is None:
+            return None
+        cached_path = self.cache.path(video_cache_key(self.video_url, self._format_policy()))
+        return cached_path if os.path.exists(cached_path) else None
+
+    def _probe_stream(self):
+        """Ask yt-dlp for (fps, total_frames, width, height) of the format it would download"""
+        format_args = self._format_args()
+        chosen = self.selected_format
+        if chosen and chosen.get("width"):
+            fps = chosen.get("fps") or 30.0
+            return fps, int((self.video_duration or 0) * fps), chosen["width"], chosen["height"]
+
+        command = ["yt-dlp"] + format_args + [
+            "--skip-download",
+            "--print", "%(fps)s %(width)s %(height)s %(duration)s",
+            self.video_url
+        ]
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"yt-dlp error:\n{result.stderr}")
+            return None
+
+        try:
+            fps, width, height, duration = result.stdout.split()[:4]
+            fps = float(fps) if fps != "NA" else 30.0
+            total_frames = int(float(duration) * fps) if duration != "NA" else 0
+            return fps, total_frames, int(width), int(height)
+        except ValueError:
+            print(f"Unexpected yt-dlp format info: {result.stdout.strip()}")
+            return None
+
+    def _create_stream_decoder(self):
+        """Decode the video from a yt-dlp pipe while it downloads"""
+        try:
+            info = self._probe_stream()
+            if info is None:
+                return None
+            # Progress lines would pile up in the stderr kept for error reports
+            command = self._download_command("-")
+            command.insert(1, "--no-progress")
+            source = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except OSError as e:
+            print(f"Error downloading video: {e}")
+            return None
+
+        # A manual region is given in pixels of the video being streamed
+        self._roi_source_size = (info[2], info[3])
+        print("Streaming video while it downloads...")
+        return FFmpegPipeDecoder(self.video_path, self.interval, self.stats, scale_width=self.scale_width,
+                                 keyframes_only=self.keyframes_only, source=source, info=info, time_grid=True)
+
+    def create_decoder(self, start_frame=0):
+        """Build the frame decoder for the configured backend"""
+        if self.keyframes_only:
+            # Skipping non-key frames happens inside ffmpeg's decoder
+            return FFmpegPipeDecoder(self.video_path, self.interval, self.stats,
+                                     scale_width=self.scale_width, keyframes_only=True, start_frame=start_frame)
+        if self.stream:
+            # Sample a downloaded or cached file like the stream, so resuming a streamed run matches it
+            return FFmpegPipeDecoder(self.video_path, self.interval, self.stats, scale_width=self.scale_width,
+                                     start_frame=start_frame, time_grid=True)
+        if self.backend == "ffmpeg-pipe":
+            return FFmpegPipeDecoder(self.video_path, self.interval, self.stats, scale_width=self.scale_width,
+                                     start_frame=start_frame)
+        return OpenCVDecoder(self.video_path, self.interval, self.stats, sampling=self.sampling,
+                             start_frame=start_frame)
+
+    def _decoder_backend(self):
+        """The backend frames are decoded with: streamed runs always use ffmpeg-pipe"""
+        return "ffmpeg-pipe" if self.stream else self.backend
+
     def extract_slides(self):
         """Process the video to extract slides"""
-        if not os.path.exists(self.video_path):
-            if not self.download_video():
+        try:
+            return self._extract_slides()
+        finally:
+            # Parallel workers, the merge and ROI sampling all reopen the video until here
+            self.release_video()
+
+    def _extract_slides(self):
+        checkpoint = None
+        if self.resume:
+            checkpoint = self._load_checkpoint()
+            if checkpoint is False:
                 return False
 
-        cap = cv2.VideoCapture(self.video_path)
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_interval = int(fps * self.interval)
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        duration = total_frames / fps
+        streaming = (self.stream and checkpoint is None
+                     and not os.path.exists(self.video_path) and not self._cached_video_path())
+        if not streaming and not self.fetch_video():
+            return False
 
-        print(f"Video duration: {timedelta(seconds=duration)}")
-        print(f"Processing frames every {self.interval} seconds...")
+        self._reset_stats()
+        if self.ocr_engine_name == "auto" and tesserocr is None:
+            print("OCR engine: tesseract CLI, one process per image "
+                  "(install the optional tesserocr package for persistent OCR workers)")
+        self._prepare_roi(streaming)
+        self._prepare_index(checkpoint)
+        if self.jobs > 1:
+            return self._extract_parallel()
 
-        prev_frame = None
-        slide_count = 0
+        if streaming:
+            decoder = self._create_stream_decoder()
+        else:
+            decoder = self.create_decoder(start_frame=checkpoint["last_frame"] + 1 if checkpoint else 0)
+        if decoder is None or not decoder.open():
+            return False
 
-        for frame_num in range(0, total_frames, frame_interval):
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
-            ret, frame = cap.read()
+        duration = decoder.total_frames / decoder.fps
 
-            if not ret:
-                continue
+        if duration:
+            print(f"Video duration: {timedelta(seconds=duration)}")
+        if self.keyframes_only:
+            print(f"Processing keyframes only ({decoder.describe()})...")
+        else:
+            print(f"Processing frames every {self.interval} seconds ({decoder.describe()})...")
 
-            current_time = frame_num / fps
-            timestamp = str(timedelta(seconds=current_time)).split(".")[0]
+        start = time.perf_counter()
+        try:
+            slides = self._detect_slides(decoder, checkpoint)
+        finally:
+            decoded = decoder.close()
+            self.close_ocr_engine()
+        if not decoded:
+            print(f"Decoding stopped early after {len(slides)} slides, the video could not be read to the end")
+            return False
 
-            if prev_frame is None:
-                self._save_slide(frame, timestamp, slide_count)
-                prev_frame = frame
-                slide_count += 1
-                continue
+        self._remove_checkpoint()
+        self.stats["elapsed"] = time.perf_counter() - start
+        print(f"Extracted {len(slides)} slides to {self.output_dir}")
+        self._write_manifest(slides, decoder.fps)
+        self._report_stats()
+        return True
 
-            if self._is_different_slide(prev_frame, frame):
-                self._save_slide(frame, timestamp, slide_count)
-                prev_frame = frame
-                slide_count += 1
+    def _reset_stats(self):
+        self.stats = {"sampling": self.sampling, "frames_decoded": 0, "samples": 0, "decode_time": 0.0,
+                      "comparisons": 0, "compare_time": 0.0, "ssim_decided": {}, "cascade": {},
+                      "slides_written": 0, "encode_time": 0.0, "bytes_written": 0, "reference_builds": 0,
+                      "revisits": 0}
+        self._stats_lock = threading.Lock()
+        self.ocr_cache = LRUCache(self.ocr_cache_size)
+        self._reference = None
 
-        cap.release()
-        print(f"Extracted {slide_count} slides to {self.output_dir}")
+    def _detect_slides(self, decoder, checkpoint=None):
+        """Compare every sampled frame with the current slide and save the new ones.
+
+        Continues from a loaded checkpoint when one is given. Returns a list
+        of (frame_num, path) for the saved slides.
+        """
+        if self.sampling == "adaptive":
+            return self._detect_slides_adaptive(decoder, checkpoint)
+        if self.pipeline:
+            return self._detect_slides_pipelined(decoder, checkpoint)
+        if self.comparator == "batch":
+            return self._detect_slides_batched(decoder, checkpoint)
+
+        slides, prev_frame, prev_hash = self._initial_state(checkpoint)
+
+        for frame_num, frame in decoder.frames():
+            frame_hash = self._frame_hash(frame)
+
+            if prev_frame is None or self._is_different_slide(prev_frame, frame, prev_hash, frame_hash):
+                path = self._record_slide(frame, self._timestamp(frame_num, decoder.fps), len(slides))
+                slides.append((frame_num, path))
+                prev_frame = frame.copy() if decoder.reuses_buffer else frame
+                prev_hash = frame_hash
+
+            if self._checkpoint_due():
+                self._write_checkpoint(frame_num, slides, prev_frame, prev_hash)
+
+        return slides
+
+    def _detect_slides_batched(self, decoder, checkpoint=None):
+        """Collect batch_size samples and score them against the current slide in one SSIM pass.
+
+        Frames are still decided one by one in order; a new slide makes the
+        remaining scores of the batch stale, so they are computed again
+        against the new reference.
+        """
+        slides, prev_frame, prev_hash = self._initial_state(checkpoint)
+        batch = []
+
+        def flush():
+            nonlocal prev_frame, prev_hash
+            scores = None
+            for i, (frame_num, frame, frame_hash) in enumerate(batch):
+                proxy_score = None
+                if prev_frame is not None and self._hash_decision(prev_hash, frame_hash) is None:
+                    if scores is None:
+                        scores = self._batch_proxy_scores(prev_frame, prev_hash, batch, i)
+                    proxy_score = scores.get(i)
+
+                if prev_frame is None or self._is_different_slide(prev_frame, frame, prev_hash, frame_hash,
+                                                                  proxy_score):
+                    path = self._record_slide(frame, self._timestamp(frame_num, decoder.fps), len(slides))
+                    slides.append((frame_num, path))
+                    prev_frame, prev_hash = frame, frame_hash
+                    scores = None
+
+            if self._checkpoint_due():
+                self._write_checkpoint(batch[-1][0], slides, prev_frame, prev_hash)
+            batch.clear()
+
+        for frame_num, frame in decoder.frames():
+            frame = frame.copy() if decoder.reuses_buffer else frame
+            batch.append((frame_num, frame, self._frame_hash(frame)))
+            if len(batch) == self.batch_size:
+                flush()
+        if batch:
+            flush()
+
+        return slides
+
+    def _batch_proxy_scores(self, reference, reference_hash, batch, start):
+        """First-level SSIM of batch[start:] against the reference, for frames the hash left undecided"""
+        begin = time.perf_counter()
+        indexes = [i for i in range(start, len(batch)) if self._hash_decision(reference_hash, batch[i][2]) is None]
+        reference = self._reference_frame(reference)
+        size = self._level_size(reference.gray.shape, self._ssim_levels(reference.gray.shape[1])[0])
+        proxies = np.stack([self._ssim_proxy(batch[i][1], size) for i in indexes])
+        scores = batch_ssim(None, proxies, reference_stats=reference.ssim_stats(size))
+        self.stats["compare_time"] = self.stats.get("compare_time", 0.0) + time.perf_counter() - begin
+        return dict(zip(indexes, scores.tolist()))
+
+    def _detect_slides_adaptive(self, decoder, checkpoint=None):
+        """Sample with a step that doubles while frames still match the current slide.
+
+        When a sample differs, bisect between it and the last matching sample
+        down to the first differing frame, so slide timestamps are exact. The
+        step restarts at the configured interval after every new slide and
+        never grows past max_interval.
+        """
+        base_step = decoder.frame_interval
+        max_step = max(base_step, int(self.max_interval * decoder.fps))
+        last_frame = decoder.end_frame - 1
+        slides, reference, reference_hash = self._initial_state(checkpoint)
+
+        def save(frame_num, frame, frame_hash):
+            path = self._record_slide(frame, self._timestamp(frame_num, decoder.fps), len(slides))
+            slides.append((frame_num, path))
+            return frame, frame_hash
+
+        if checkpoint:
+            position = checkpoint["last_frame"]
+            step = checkpoint.get("adaptive_step", base_step)
+        else:
+            position, step = 0, base_step
+            frame = decoder.read(0)
+            if frame is None:
+                return slides
+            reference, reference_hash = save(0, frame, self._frame_hash(frame))
+
+        while position < last_frame:
+            candidate = min(position + step, last_frame)
+            frame = decoder.read(candidate)
+            if frame is None:
+                break
+            frame_hash = self._frame_hash(frame)
+
+            if not self._is_different_slide(reference, frame, reference_hash, frame_hash):
+                position = candidate
+                step = min(step * 2, max_step)
+            else:
+                low, high = position, candidate
+                while high - low > 1:
+                    middle = (low + high) // 2
+                    middle_frame = decoder.read(middle)
+                    if middle_frame is None:
+                        break
+                    middle_hash = self._frame_hash(middle_frame)
+                    if self._is_different_slide(reference, middle_frame, reference_hash, middle_hash):
+                        high, frame, frame_hash = middle, middle_frame, middle_hash
+                    else:
+                        low = middle
+
+                reference, reference_hash = save(high, frame, frame_hash)
+                position = high
+                step = base_step
+
+            if self._checkpoint_due():
+                self._write_checkpoint(position, slides, reference, reference_hash, adaptive_step=step)
+
+        return slides
+
+    def _initial_state(self, checkpoint):
+        """(slides, reference frame, reference hash) to start detection from"""
+        self._last_checkpoint = time.monotonic()
+        if checkpoint is None:
+            return [], None, None
+        self._checkpointed_reference = len(checkpoint["slides"])
+        return list(checkpoint["slides"]), checkpoint["reference"], checkpoint["reference_hash"]
+
+    def _checkpoint_settings(self):
+        """Settings that change the output; a checkpoint only resumes a run with the same ones"""
+        return {
+            "video_url": self.video_url, "interval": self.interval,
+            "similarity_threshold": self.similarity_threshold, "backend": self._decoder_backend(),
+            "stream": self.stream,
+            "scale_width": self.scale_width, "keyframes_only": self.keyframes_only,
+            "sampling": self.sampling, "max_interval": self.max_interval,
+            "proxy_width": self.proxy_width, "ssim_band": self.ssim_band, "hash_size": self.hash_size,
+            "hash_same_distance": self.hash_same_distance, "hash_diff_distance": self.hash_diff_distance,
+            "slide_format": self.slide_format, "jpeg_quality": self.jpeg_quality, "min_height": self.min_height,
+            # The requested region: a detected one is only known after the checkpoint is loaded
+            "roi": list(self.roi) if self.roi not in (None, "auto") else self.roi, "crop_slides": self.crop_slides,
+            "comparator": self.comparator, "dedupe": self.dedupe,
+            "dedupe_distance": self.dedupe_distance, "dedupe_similarity": self.dedupe_similarity,
+        }
+
+    def _checkpoint_due(self):
+        return bool(self.checkpoint_interval) and time.monotonic() - self._last_checkpoint >= self.checkpoint_interval
+
+    def _write_checkpoint(self, last_frame, slides, reference, reference_hash, **extra):
+        """Atomically record the last processed frame, the saved slides and the reference frame"""
+        if self._checkpointed_reference != len(slides):
+            temp_path = f"{self.reference_path}.tmp"
+            with open(temp_path, "wb") as f:
+                np.save(f, reference)
+            os.replace(temp_path, self.reference_path)
+            self._checkpointed_reference = len(slides)
+
+        state = {
+            "settings": self._checkpoint_settings(),
+            "last_frame": last_frame,
+            "slides": [[frame_num, os.path.basename(path)] for frame_num, path in slides],
+            "reference_hash": reference_hash,
+        }
+        state.update(extra)
+        write_atomic(self.checkpoint_path, json.dumps(state).encode())
+        self._last_checkpoint = time.monotonic()
+
+    def _load_checkpoint(self):
+        """Read the checkpoint to resume from: None if there is none, False if it cannot be used"""
+        if not os.path.exists(self.checkpoint_path):
+            print("No checkpoint found, starting from the beginning")
+            return None
+
+        with open(self.checkpoint_path) as f:
+            state = json.load(f)
+        if state["settings"] != self._checkpoint_settings():
+            print(f"Checkpoint {self.checkpoint_path} was written with different settings, not resuming")
+            return False
+
+        state["slides"] = [(frame_num, os.path.join(self.output_dir, filename))
+                           for frame_num, filename in state["slides"]]
+        missing = [path for _, path in state["slides"] if not os.path.exists(path)]
+        if missing:
+            print(f"Checkpointed slide {missing[0]} is missing, not resuming")
+            return False
+
+        state["reference"] = np.load(self.reference_path)
+        print(f"Resuming after frame {state['last_frame']} with {len(state['slides'])} slides")
+        return state
+
+    def _remove_checkpoint(self):
+        for path in (self.checkpoint_path, self.reference_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _detect_slides_pipelined(self, decoder, checkpoint=None):
+        """_detect_slides with decoding, comparison and slide writing on separate threads.
+
+        cv2 decoding, image operations and PNG encoding release the GIL, so
+        the stages overlap. A bounded queue holds at most queue_depth decoded
+        frames and at most queue_depth slides wait for the writer pool. The
+        time each stage spends working (not waiting) ends up in the stats.
+        """
+        frames = queue.Queue(maxsize=self.queue_depth)
+        write_slots = threading.BoundedSemaphore(self.queue_depth)
+        stop = threading.Event()
+        busy = {"decode": 0.0, "compare": 0.0, "write": 0.0}
+        busy_lock = threading.Lock()
+        end_of_stream = object()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    frames.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def decode():
+            try:
+                iterator = decoder.frames()
+                while True:
+                    t0 = time.perf_counter()
+                    item = next(iterator, None)
+                    if item is not None and decoder.reuses_buffer:
+                        item = (item[0], item[1].copy())
+                    busy["decode"] += time.perf_counter() - t0
+                    if item is None or not put(item):
+                        break
+            except Exception as e:
+                put(e)
+                return
+            put(end_of_stream)
+
+        def write(frame, timestamp, count):
+            t0 = time.perf_counter()
+            try:
+                return self._save_slide(frame, timestamp, count)
+            finally:
+                with busy_lock:
+                    busy["write"] += time.perf_counter() - t0
+                write_slots.release()
+
+        decode_thread = threading.Thread(target=decode, name="decode", daemon=True)
+        writers = ThreadPoolExecutor(max_workers=self.writer_threads, thread_name_prefix="slide-writer")
+        saved, prev_frame, prev_hash = self._initial_state(checkpoint)
+        slides = []
+        for frame_num, path in saved:
+            written = Future()
+            written.set_result(path)
+            slides.append((frame_num, written))
+        queue_peak = 0
+
+        decode_thread.start()
+        try:
+            while True:
+                queue_peak = max(queue_peak, frames.qsize())
+                item = frames.get()
+                if item is end_of_stream:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+
+                t0 = time.perf_counter()
+                frame_num, frame = item
+                frame_hash = self._frame_hash(frame)
+                is_new = prev_frame is None or self._is_different_slide(prev_frame, frame, prev_hash, frame_hash)
+                busy["compare"] += time.perf_counter() - t0
+
+                if is_new:
+                    timestamp = self._timestamp(frame_num, decoder.fps)
+                    revisit = self._find_revisit(frame, timestamp)
+                    if revisit:
+                        job = Future()
+                        job.set_result(revisit)
+                    else:
+                        write_slots.acquire()
+                        self._index_slide(self._slide_path(timestamp, len(slides)), self._crop(frame))
+                        job = writers.submit(write, frame, timestamp, len(slides))
+                    slides.append((frame_num, job))
+                    prev_frame = frame
+                    prev_hash = frame_hash
+
+                if self._checkpoint_due():
+                    # Waits for pending writes so every checkpointed slide is on disk
+                    written = [(slide_frame, job.result()) for slide_frame, job in slides]
+                    self._write_checkpoint(frame_num, written, prev_frame, prev_hash)
+        finally:
+            stop.set()
+            writers.shutdown(wait=True)
+            decode_thread.join()
+
+        self.stats["stage_busy"] = busy
+        self.stats["frame_queue_peak"] = queue_peak
+        return [(frame_num, job.result()) for frame_num, job in slides]
+
+    def _timestamp(self, frame_num, fps):
+        return str(timedelta(seconds=frame_num / fps)).split(".")[0]
+
+    def _extract_parallel(self):
+        """Process time segments in worker processes and merge them in order.
+
+        Each segment starts with no reference slide, so its first slides may
+        disagree with a serial run. The merge replays the start of every
+        segment against the previous segment's last slide until it reaches a
+        slide the worker also saved; from there on both share the same
+        reference and the worker's slides are kept as they are.
+        """
+        info = probe_video(self.video_path)
+        if info is None:
+            print(f"Could not open video: {self.video_path}")
+            return False
+
+        fps, total_frames, _, _ = info
+        frame_interval = max(1, int(fps * self.interval))
+        sample_points = range(0, total_frames, frame_interval)
+        bounds = sorted({sample_points[len(sample_points) * k // self.jobs] for k in range(self.jobs)})
+        segments = list(zip(bounds, bounds[1:] + [total_frames]))
+
+        print(f"Video duration: {timedelta(seconds=total_frames / fps)}")
+        print(f"Processing frames every {self.interval} seconds in {len(segments)} parallel segments...")
+
+        start = time.perf_counter()
+        segment_root = os.path.join(self.output_dir, ".segments")
+        self.close_ocr_engine()
+        slides = []
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                futures = [
+                    pool.submit(_extract_segment, self, start_frame, end_frame,
+                                os.path.join(segment_root, f"{index:03d}"))
+                    for index, (start_frame, end_frame) in enumerate(segments)
+                ]
+                for (start_frame, end_frame), future in zip(segments, futures):
+                    segment_slides, segment_stats = future.result()
+                    self._merge_stats(segment_stats)
+                    self._merge_segment(slides, segment_slides, start_frame, end_frame, fps)
+        finally:
+            shutil.rmtree(segment_root, ignore_errors=True)
+            self.close_ocr_engine()
+
+        self.stats["sampling"] = f"{self.jobs} jobs"
+        self.stats["elapsed"] = time.perf_counter() - start
+        print(f"Extracted {len(slides)} slides to {self.output_dir}")
+        self._write_manifest(slides, fps)
+        self._report_stats()
         return True
 
-    def _is_different_slide(self, frame1, frame2):
-        gray1 = cv2.cvtColor(frame1, cv2.COLOR_BGR2GRAY)
-        gray2 = cv2.cvtColor(frame2, cv2.COLOR_BGR2GRAY)
+    def _merge_segment(self, slides, segment_slides, start_frame, end_frame, fps):
+        """Append one segment's slides to the merged list, renumbering them"""
+        worker_slides = dict(segment_slides)
 
-        similarity, _ = ssim(gray1, gray2, full=True)
-        if similarity < self.similarity_threshold:
-            return True
+        if slides:
+            reference = read_frame(self.video_path, slides[-1][0])
+            reference_hash = self._frame_hash(reference)
+            decoder = OpenCVDecoder(self.video_path, self.interval, self.stats, sampling=self.sampling,
+                                    start_frame=start_frame, end_frame=end_frame)
+            decoder.open()
+            try:
+                for frame_num, frame in decoder.frames():
+                    frame_hash = self._frame_hash(frame)
+                    if not self._is_different_slide(reference, frame, reference_hash, frame_hash):
+                        continue
+                    if frame_num in worker_slides:
+                        break
+                    # The worker compared against a different reference and missed this slide
+                    path = self._record_slide(frame, self._timestamp(frame_num, fps), len(slides))
+                    slides.append((frame_num, path))
+                    reference, reference_hash = frame, frame_hash
+                else:
+                    return
+            finally:
+                decoder.close()
+            synced_frame = frame_num
+        else:
+            synced_frame = start_frame
+
+        for frame_num, segment_path in segment_slides:
+            if frame_num < synced_frame:
+                continue
+            timestamp = self._timestamp(frame_num, fps)
+            region = self._saved_region(segment_path) if self.slide_index is not None else None
+            revisit = self._find_revisit(region, timestamp, cropped=True) if region is not None else None
+            if revisit:
+                os.remove(segment_path)
+                slides.append((frame_num, revisit))
+                continue
+            path = self._slide_path(timestamp, len(slides))
+            os.replace(segment_path, path)
+            if region is not None:
+                self._index_slide(path, region)
+            slides.append((frame_num, path))
+            print(f"Saved slide: {os.path.basename(path)}")
+
+    def _merge_stats(self, other):
+        """Add a worker's counters to this run's stats"""
+        for key, value in other.items():
+            if isinstance(value, dict):
+                merged = self.stats.setdefault(key, {})
+                for item, count in value.items():
+                    merged[item] = merged.get(item, 0) + count
+            elif key.endswith("_peak"):
+                self.stats[key] = max(self.stats.get(key, 0), value)
+            elif isinstance(value, (int, float)) and key != "elapsed":
+                self.stats[key] = self.stats.get(key, 0) + value
+
+    def _report_stats(self):
+        """Print throughput figures for the last run"""
+        stats = self.stats
+        decode_time = stats.get("decode_time") or 1e-9
+        print(f"Sampling: {stats['sampling']}, "
+              f"decoded {stats['frames_decoded']} frames ({stats['samples']} samples) "
+              f"in {stats['decode_time']:.2f}s: "
+              f"{stats['frames_decoded'] / decode_time:.1f} decoded frames/s, "
+              f"{stats['samples'] / decode_time:.1f} samples/s")
+        if stats["comparisons"]:
+            levels = ", ".join(f"{level}: {count}" for level, count in sorted(stats["ssim_decided"].items()))
+            print(f"Comparisons: {stats['comparisons']}, "
+                  f"{stats['compare_time'] / stats['comparisons'] * 1000:.2f} ms average"
+                  + (f" (SSIM decided at width {levels})" if levels else ""))
+            stages = ", ".join(f"{stage}: {count}" for stage, count in sorted(stats["cascade"].items()))
+            print(f"Decided by stage: {stages}")
+            print(f"Reference statistics built {stats.get('reference_builds', 0)} times "
+                  f"for {stats['comparisons']} comparisons")
+        if self.slide_index is not None:
+            print(f"Revisits: {stats.get('revisits', 0)} slides shown again were recorded in "
+                  f"{os.path.basename(self.manifest_path)} instead of saved")
+        hits = stats.get("ocr_cache_hits", 0) + self.ocr_cache.hits
+        misses = stats.get("ocr_cache_misses", 0) + self.ocr_cache.misses
+        if hits + misses:
+            print(f"OCR cache: {hits} hits, {misses} misses ({hits / (hits + misses):.0%} hit rate)")
+        if stats.get("slides_written"):
+            written = stats["slides_written"]
+            print(f"Slide writer ({self.slide_format}): {stats['encode_time'] / written * 1000:.1f} ms "
+                  f"and {stats['bytes_written'] / written / 1024:.0f} KiB per slide, "
+                  f"{stats['bytes_written'] / 1024 / 1024:.1f} MiB written")
+        if "stage_busy" in stats:
+            busy = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in stats["stage_busy"].items())
+            print(f"Pipeline (queue depth {self.queue_depth}, {self.writer_threads} writers): busy time {busy}, "
+                  f"frame queue peak {stats['frame_queue_peak']}")
+        print(f"Total processing time: {stats['elapsed']:.2f}s")
+
+    def _prepare_roi(self, streaming=False):
+        """Detect the slide region when asked to, and remember the frame size it refers to.
+
+        When streaming, the size comes from the probe in _create_stream_decoder.
+        """
+        self._roi_crops = {}
+        if self.roi != "auto" and self.roi_box is None:
+            return
+        if streaming:
+            if self.roi == "auto":
+                print("Slide region detection needs a downloaded video, comparing whole frames")
+                self.roi_box = None
+            return
+
+        info = probe_video(self.video_path)
+        if info is None:
+            return
+        self._roi_source_size = (info[2], info[3])
+
+        if self.roi == "auto":
+            pairs = sample_frame_pairs(self.video_path)
+            self.roi_box = detect_slide_roi(pairs) if pairs else None
+            if self.roi_box:
+                print(f"Detected slide region: x={self.roi_box[0]} y={self.roi_box[1]} "
+                      f"{self.roi_box[2]}x{self.roi_box[3]}")
+            else:
+                print("No separate slide region detected, comparing whole frames")
+
+    def _crop(self, frame):
+        """View of the slide region of a decoded frame (which may be downscaled)"""
+        if not self.roi_box:
+            return frame
+
+        height, width = frame.shape[:2]
+        crop = self._roi_crops.get((width, height))
+        if crop is None:
+            source_width, source_height = self._roi_source_size or (width, height)
+            sx, sy = width / source_width, height / source_height
+            x, y, w, h = self.roi_box
+            x0, y0 = int(round(x * sx)), int(round(y * sy))
+            crop = (slice(y0, max(y0 + 7, int(round((y + h) * sy)))), slice(x0, max(x0 + 7, int(round((x + w) * sx)))))
+            self._roi_crops[(width, height)] = crop
+        return frame[crop]
 
-        text1 = self._extract_text(frame1)
-        text2 = self._extract_text(frame2)
+    def _frame_hash(self, frame):
+        """Perceptual hash used by the comparison cascade, None when disabled"""
+        return dhash(self._crop(frame), self.hash_size) if self.hash_size else None
+
+    def _is_different_slide(self, frame1, frame2, hash1=None, hash2=None, proxy_score=None):
+        start = time.perf_counter()
+        try:
+            different, stage = self._compare_frames(frame1, frame2, hash1, hash2, proxy_score)
+            cascade = self.stats.setdefault("cascade", {})
+            cascade[stage] = cascade.get(stage, 0) + 1
+            return different
+        finally:
+            self.stats["comparisons"] = self.stats.get("comparisons", 0) + 1
+            self.stats["compare_time"] = self.stats.get("compare_time", 0.0) + time.perf_counter() - start
+
+    def _hash_decision(self, hash1, hash2):
+        """Stage name when the hash distance alone decides, None when SSIM has to look"""
+        if not self.hash_size:
+            return None
+        distance = hamming_distance(hash1, hash2)
+        if distance <= self.hash_same_distance:
+            return "hash-same"
+        if distance >= self.hash_diff_distance:
+            return "hash-different"
+        return None
+
+    def _reference_frame(self, frame):
+        """Cached ReferenceFrame for the current slide, rebuilt when a new slide takes its place.
+
+        Every detection loop keeps the saved slide's array as its reference,
+        so identity tells whether the cached statistics still apply.
+        """
+        if self._reference is None or self._reference.frame is not frame:
+            self._reference = ReferenceFrame(frame, self._crop(frame))
+            self.stats["reference_builds"] = self.stats.get("reference_builds", 0) + 1
+        return self._reference
+
+    def _compare_frames(self, frame1, frame2, hash1=None, hash2=None, proxy_score=None):
+        """Run the hash / SSIM / OCR cascade on (reference, candidate), returning (is_different, deciding stage)
+
+        proxy_score is a precomputed SSIM at the first comparison width.
+        """
+        reference = self._reference_frame(frame1)
+        frame2 = self._crop(frame2)
+        if self.hash_size:
+            hash1 = reference.hash(self.hash_size) if hash1 is None else hash1
+            hash2 = dhash(frame2, self.hash_size) if hash2 is None else hash2
+            stage = self._hash_decision(hash1, hash2)
+            if stage:
+                return stage == "hash-different", stage
+
+        if not self._ssim_similar(reference, frame2, proxy_score):
+            return True, "ssim-different"
+
+        text1, text2 = self._extract_texts(reference.region, frame2)
 
         if text1 and text2:
             words1 = set(text1.split())
@@ -102,63 +1918,384 @@ class SlideExtractor:
             diff_ratio = 1 - len(common_words) / max(len(words1), len(words2))
 
             if diff_ratio > 0.3:
+                return True, "ocr-different"
+
+        return False, "ocr-same"
+
+    def _ssim_levels(self, width):
+        """Comparison widths from the smallest proxy up to full resolution"""
+        levels = []
+        level_width = self.proxy_width
+        while level_width and level_width < width:
+            levels.append(level_width)
+            level_width *= 2
+        levels.append(width)
+        return levels
+
+    @staticmethod
+    def _level_size(shape, level_width):
+        """(width, height) of a comparison level for a grayscale image of the given shape"""
+        height, width = shape
+        if level_width == width:
+            return width, height
+        return level_width, max(7, int(round(height * level_width / width)))
+
+    def _ssim_score(self, reference, size, gray):
+        if self.comparator == "batch":
+            return float(batch_ssim(None, gray[np.newaxis], reference_stats=reference.ssim_stats(size))[0])
+        return ssim(reference.level(size), gray)
+
+    def _ssim_proxy(self, frame, size):
+        """Grayscale slide region resized to size, as scored by the batch comparator"""
+        gray = cv2.cvtColor(self._crop(frame), cv2.COLOR_BGR2GRAY)
+        if size == gray.shape[::-1]:
+            return gray
+        return cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+
+    def _ssim_similar(self, reference, frame, proxy_score=None):
+        """SSIM check on downscaled proxies, escalating only when the score is ambiguous"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        width = reference.gray.shape[1]
+        decided = self.stats.setdefault("ssim_decided", {})
+
+        for level, level_width in enumerate(self._ssim_levels(width)):
+            size = self._level_size(reference.gray.shape, level_width)
+            if level == 0 and proxy_score is not None:
+                similarity = proxy_score
+            elif level_width == width:
+                similarity = self._ssim_score(reference, size, gray)
+            else:
+                similarity = self._ssim_score(reference, size, cv2.resize(gray, size, interpolation=cv2.INTER_AREA))
+
+            if level_width == width:
+                decided[width] = decided.get(width, 0) + 1
+                return similarity >= self.similarity_threshold
+
+            if similarity >= self.similarity_threshold + self.ssim_band:
+                decided[level_width] = decided.get(level_width, 0) + 1
                 return True
+            if similarity < self.similarity_threshold - self.ssim_band:
+                decided[level_width] = decided.get(level_width, 0) + 1
+                return False
 
-        return False
+    def _get_ocr_engine(self):
+        if self.ocr_engine is None:
+            self.ocr_engine = create_ocr_engine(self.ocr_engine_name, self.ocr_workers)
+        return self.ocr_engine
 
-    def _extract_text(self, frame):
-        try:
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            _, threshold = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY)
+    def close_ocr_engine(self):
+        """Stop the OCR workers, they are restarted on the next OCR call"""
+        if self.ocr_engine is not None:
+            self.ocr_engine.close()
+            self.ocr_engine = None
 
-            temp_image_path = os.path.join(self.output_dir, "temp_ocr.png")
-            cv2.imwrite(temp_image_path, threshold)
+    def _extract_texts(self, *frames):
+        """OCR frames concurrently, reusing results for frames already read this run"""
+        keys = [frame_digest(frame) for frame in frames]
+        texts = [self.ocr_cache.get(key) for key in keys]
+        jobs = {}
+        for i, frame in enumerate(frames):
+            if texts[i] is None and keys[i] not in jobs:
+                jobs[keys[i]] = self._submit_ocr(frame)
 
-            text = pytesseract.image_to_string(Image.open(temp_image_path), config='--psm 6')
-            return text.strip()
-        except Exception as e:
-            print(f"OCR error: {e}")
-            return ""
+        results = {}
+        for key, job in jobs.items():
+            try:
+                results[key] = job.result().strip()
+            except Exception as e:
+                print(f"OCR error: {e}")
+                results[key] = ""
+            self.ocr_cache.put(key, results[key])
+
+        return [text if text is not None else results[key] for key, text in zip(keys, texts)]
+
+    def _submit_ocr(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        _, threshold = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY)
+        return self._get_ocr_engine().submit(threshold)
+
+    def _slide_filename(self, timestamp, count):
+        return f"slide_{count:03d}_{timestamp.replace(':', '-')}{SLIDE_FORMATS[self.slide_format]}"
+
+    def _slide_path(self, timestamp, count):
+        return os.path.join(self.output_dir, self._slide_filename(timestamp, count))
+
+    def _prepare_index(self, checkpoint=None):
+        """Start the revisit index, re-reading the checkpointed slides when resuming"""
+        self.slide_index = None
+        if not self.dedupe:
+            return
+        self.slide_index = SlideIndex(self.dedupe_distance, self.dedupe_similarity)
+        if checkpoint:
+            for _, path in checkpoint["slides"]:
+                if path not in self.slide_index.thumbnails:
+                    self.slide_index.add(path, self._saved_region(path))
+            self.slide_index.last = checkpoint["slides"][-1][1] if checkpoint["slides"] else None
+
+    def _saved_region(self, path):
+        """Slide region of a slide image already written to disk"""
+        image = cv2.imread(path)
+        return image if self.crop_slides else self._crop(image)
+
+    def _find_revisit(self, frame, timestamp, cropped=False):
+        """Path of the earlier slide this frame shows again, None for a new slide or without dedupe"""
+        if self.slide_index is None:
+            return None
+        path = self.slide_index.find(frame if cropped else self._crop(frame))
+        if path is not None:
+            self.slide_index.last = path
+            self.stats["revisits"] = self.stats.get("revisits", 0) + 1
+            if self.log_saves:
+                print(f"Revisited slide: {os.path.basename(path)} at {timestamp}")
+        return path
+
+    def _index_slide(self, path, region):
+        if self.slide_index is not None:
+            self.slide_index.add(path, region)
+
+    def _record_slide(self, frame, timestamp, count):
+        """Save a new slide, or return the earlier slide's path when the index recognises a revisit"""
+        revisit = self._find_revisit(frame, timestamp)
+        if revisit:
+            return revisit
+        path = self._save_slide(frame, timestamp, count)
+        self._index_slide(path, self._crop(frame))
+        return path
+
+    def _write_manifest(self, slides, fps):
+        """List every slide shown, in order, with revisits pointing at the earlier file"""
+        if not self.dedupe:
+            return
+        seen = set()
+        entries = []
+        for frame_num, path in slides:
+            filename = os.path.basename(path)
+            entries.append({"frame": frame_num, "timestamp": self._timestamp(frame_num, fps),
+                            "file": filename, "revisit": filename in seen})
+            seen.add(filename)
+        manifest = {"video": self.video_url, "slides": entries}
+        write_atomic(self.manifest_path, json.dumps(manifest, indent=2).encode())
 
     def _save_slide(self, frame, timestamp, count):
-        filename = f"slide_{count:03d}_{timestamp.replace(':', '-')}.png"
-        path = os.path.join(self.output_dir, filename)
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        pil_image = Image.fromarray(rgb_frame)
-        pil_image.save(path)
-        print(f"Saved slide: {filename}")
-
-    def convert_slides_to_pdf(self, pdf_name="slides_output.pdf"):
-        """Convert all extracted slides to a single PDF file."""
+        path = self._slide_path(timestamp, count)
+        filename = os.path.basename(path)
+
+        if self.crop_slides:
+            frame = self._crop(frame)
+
+        start = time.perf_counter()
+        encoded = encode_image(frame, self.slide_format, self.png_compression, self.jpeg_quality)
+        encode_time = time.perf_counter() - start
+        write_atomic(path, encoded.tobytes())
+
+        with self._stats_lock:
+            self.stats["slides_written"] = self.stats.get("slides_written", 0) + 1
+            self.stats["encode_time"] = self.stats.get("encode_time", 0.0) + encode_time
+            self.stats["bytes_written"] = self.stats.get("bytes_written", 0) + encoded.size
+        if self.log_saves:
+            print(f"Saved slide: {filename}")
+        return path
+
+    def convert_slides_to_pdf(self, pdf_name="slides_output.pdf", passthrough=True):
+        """Convert all extracted slides to a single PDF file.
+
+        With passthrough, PNG and JPEG slides are copied into the PDF
+        without being decoded and compressed again. The pdf_profile sets the
+        resolution, palette size and JPEG quality; with a DPI (or pdf_dpi)
+        pages are 10 inches wide and larger slides are downscaled. Pages
+        are prepared on pdf_workers threads with at most pdf_in_flight in
+        memory, and pdf_max_bytes lowers the quality until the PDF fits.
+        Repeated slides are embedded once and shared by their pages.
+        """
         image_files = sorted([
             os.path.join(self.output_dir, file)
             for file in os.listdir(self.output_dir)
-            if file.lower().endswith(".png") and file.startswith("slide_")
+            if file.lower().endswith(SLIDE_EXTENSIONS) and file.startswith("slide_")
         ])
 
         if not image_files:
             print("No slide images found to convert.")
             return
 
-        images = [Image.open(img).convert("RGB") for img in image_files]
         pdf_path = os.path.join(self.output_dir, pdf_name)
-        images[0].save(pdf_path, save_all=True, append_images=images[1:])
+        profile = PDF_PROFILES[self.pdf_profile]
+        dpi = self.pdf_dpi or profile["dpi"]
+        start = time.perf_counter()
+        pdf = write_image_pdf(image_files, pdf_path, passthrough, dpi=dpi, page_width=SLIDE_PAGE_WIDTH if dpi else None,
+                              workers=self.pdf_workers, max_in_flight=self.pdf_in_flight,
+                              jpeg_quality=profile["jpeg_quality"], colors=profile["colors"],
+                              max_bytes=self.pdf_max_bytes)
+        size = os.path.getsize(pdf_path)
+        print(f"Wrote {len(image_files)} pages ({self.pdf_profile} profile, {size / 1024 / 1024:.1f} MiB) "
+              f"in {time.perf_counter() - start:.2f}s")
+        if pdf.shared_images:
+            print(f"{pdf.shared_images} repeated pages reuse an image already in the PDF")
+        if self.pdf_max_bytes and size > self.pdf_max_bytes:
+            print(f"PDF is larger than the {self.pdf_max_bytes / 1024 / 1024:.1f} MiB budget "
+                  f"even at the lowest quality")
         print(f"PDF created at: {pdf_path}")
 
 
+def _extract_segment(extractor, start_frame, end_frame, segment_dir):
+    """Worker process entry point: detect slides in one segment of the video.
+
+    Slides are written to segment_dir and returned as (frame_num, path) with
+    the worker's stats; the parent renames the ones it keeps.
+    """
+    os.makedirs(segment_dir, exist_ok=True)
+    extractor.output_dir = segment_dir
+    extractor.log_saves = False
+    extractor.checkpoint_interval = 0
+    extractor.slide_index = None  # revisits are matched by the parent while merging
+    extractor._reset_stats()
+
+    decoder = OpenCVDecoder(extractor.video_path, extractor.interval, extractor.stats,
+                            sampling=extractor.sampling, start_frame=start_frame, end_frame=end_frame)
+    if not decoder.open():
+        raise RuntimeError(f"Could not open video: {extractor.video_path}")
+    try:
+        slides = extractor._detect_slides(decoder)
+    finally:
+        decoder.close()
+        extractor.close_ocr_engine()
+
+    extractor.stats["ocr_cache_hits"] = extractor.ocr_cache.hits
+    extractor.stats["ocr_cache_misses"] = extractor.ocr_cache.misses
+    return slides, extractor.stats
+
+
+def parse_roi(value):
+    """argparse type for --roi: 'auto' or x,y,w,h in video pixels"""
+    if value == "auto":
+        return value
+    try:
+        x, y, w, h = (int(part) for part in value.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected 'auto' or x,y,w,h")
+    return x, y, w, h
+
+
 def main():
     parser = argparse.ArgumentParser(description="Extract slides from educational YouTube videos")
     parser.add_argument("url", help="YouTube video URL")
     parser.add_argument("--output", default="slides", help="Output directory for slides")
     parser.add_argument("--interval", type=int, default=5, help="Seconds between frame checks")
     parser.add_argument("--threshold", type=float, default=0.9, help="Similarity threshold")
+    parser.add_argument("--sampling", choices=SAMPLING_MODES, default="auto",
+                        help="Frame sampling: seek to each sample, decode sequentially, pick automatically, "
+                             "or adapt the step to how long slides stay up")
+    parser.add_argument("--backend", choices=DECODER_BACKENDS, default="opencv",
+                        help="Frame decoder: cv2.VideoCapture or an ffmpeg rawvideo pipe")
+    parser.add_argument("--scale-width", type=int, default=None,
+                        help="Downscale frames to this width inside ffmpeg (ffmpeg-pipe, --stream or --keyframes-only; "
+                             "slides are saved at this size)")
+    parser.add_argument("--keyframes-only", action="store_true",
+                        help="Compare only keyframes (I-frames) instead of sampling every interval")
+    parser.add_argument("--proxy-width", type=int, default=320,
+                        help="Width of the first downscaled SSIM comparison (0 compares at full resolution only)")
+    parser.add_argument("--ssim-band", type=float, default=0.05,
+                        help="Proxy SSIM scores within this distance of the threshold escalate to a larger size")
+    parser.add_argument("--hash-size", type=int, default=8,
+                        help="dHash grid size (8 = 64 bits, 16 = 256 bits, 0 disables the hash prefilter)")
+    parser.add_argument("--hash-same-distance", type=int, default=0,
+                        help="Hash distances up to this count as the same slide without SSIM or OCR")
+    parser.add_argument("--hash-diff-distance", type=int, default=None,
+                        help="Hash distances from this up count as a new slide (default: a quarter of the bits)")
+    parser.add_argument("--ocr-cache-size", type=int, default=32, help="Number of OCR results kept per run")
+    parser.add_argument("--ocr-engine", choices=OCR_ENGINES, default="auto",
+                        help="OCR backend: a tesseract process per image, or persistent tesserocr workers")
+    parser.add_argument("--ocr-workers", type=int, default=2, help="Number of concurrent OCR workers")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Worker processes, each handling one time segment of the video (opencv backend only)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Overlap decoding, comparison and slide writing on separate threads")
+    parser.add_argument("--queue-depth", type=int, default=8,
+                        help="Frames and pending slide writes buffered between pipeline stages")
+    parser.add_argument("--writer-threads", type=int, default=2, help="Threads encoding slides in pipeline mode")
+    parser.add_argument("--format", choices=sorted(SLIDE_FORMATS), default="png",
+                        help="Slide image format (WebP is saved lossless)")
+    parser.add_argument("--png-compression", type=int, default=3, help="PNG compression level, 0 (fast) to 9 (small)")
+    parser.add_argument("--jpeg-quality", type=int, default=95, help="JPEG quality, 0 to 100")
+    parser.add_argument("--stream", action="store_true",
+                        help="Detect slides while yt-dlp is still downloading (uses ffmpeg, the video is not kept)")
+    parser.add_argument("--min-height", type=int, default=720,
+                        help="Download the smallest format at least this tall, video only when possible "
+                             "(0 downloads best[ext=mp4])")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Directory of downloaded videos shared by runs")
+    parser.add_argument("--cache-size", type=float, default=DEFAULT_CACHE_SIZE / 1024 ** 3,
+                        help="Video cache budget in GiB, least recently used videos are evicted beyond it")
+    parser.add_argument("--no-cache", action="store_true", help="Download into the output directory instead")
+    parser.add_argument("--checkpoint-interval", type=float, default=30,
+                        help="Seconds between progress checkpoints in the output directory (0 disables them)")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted run from its checkpoint")
+    parser.add_argument("--max-interval", type=float, default=60,
+                        help="Longest step in seconds adaptive sampling grows to while a slide stays up")
+    parser.add_argument("--roi", type=parse_roi, default=None,
+                        help="Compare only this slide region: 'auto' to detect it, or x,y,w,h in video pixels")
+    parser.add_argument("--crop-slides", action="store_true", help="Save slides cropped to the slide region")
+    parser.add_argument("--comparator", choices=COMPARATORS, default="skimage",
+                        help="SSIM implementation: skimage per frame pair, or a NumPy kernel scoring batches of frames")
+    parser.add_argument("--batch-size", type=int, default=16, help="Frames scored per pass by the batch comparator")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="Record slides shown again later as references to the earlier file in slides.json")
+    parser.add_argument("--dedupe-distance", type=int, default=10,
+                        help="Largest dhash distance (of 64 bits) for a revisit candidate")
+    parser.add_argument("--dedupe-similarity", type=float, default=0.95,
+                        help="Thumbnail SSIM a candidate needs to count as a revisit")
+    parser.add_argument("--pdf-dpi", type=int, default=None,
+                        help="Downscale slides to this resolution on 10 inch wide PDF pages (default: embed as is)")
+    parser.add_argument("--pdf-workers", type=int, default=1, help="Threads preparing PDF pages")
+    parser.add_argument("--pdf-in-flight", type=int, default=8, help="Prepared PDF pages held in memory at most")
+    parser.add_argument("--pdf-profile", choices=list(PDF_PROFILES), default="archive",
+                        help="PDF compression: archive embeds slides as they are, screen and mobile downscale "
+                             "and use palettes or JPEG")
+    parser.add_argument("--pdf-max-mb", type=float, default=None,
+                        help="Size budget for the PDF in MiB, lowering resolution and quality to fit")
     args = parser.parse_args()
 
     extractor = SlideExtractor(
         video_url=args.url,
         output_dir=args.output,
         interval=args.interval,
-        similarity_threshold=args.threshold
+        similarity_threshold=args.threshold,
+        sampling=args.sampling,
+        backend=args.backend,
+        scale_width=args.scale_width,
+        keyframes_only=args.keyframes_only,
+        proxy_width=args.proxy_width,
+        ssim_band=args.ssim_band,
+        hash_size=args.hash_size,
+        hash_same_distance=args.hash_same_distance,
+        hash_diff_distance=args.hash_diff_distance,
+        ocr_cache_size=args.ocr_cache_size,
+        ocr_engine=args.ocr_engine,
+        ocr_workers=args.ocr_workers,
+        jobs=args.jobs,
+        pipeline=args.pipeline,
+        queue_depth=args.queue_depth,
+        writer_threads=args.writer_threads,
+        slide_format=args.format,
+        png_compression=args.png_compression,
+        jpeg_quality=args.jpeg_quality,
+        stream=args.stream,
+        min_height=args.min_height,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        cache_size=int(args.cache_size * 1024 ** 3),
+        checkpoint_interval=args.checkpoint_interval,
+        resume=args.resume,
+        max_interval=args.max_interval,
+        roi=args.roi,
+        crop_slides=args.crop_slides,
+        comparator=args.comparator,
+        batch_size=args.batch_size,
+        dedupe=args.dedupe,
+        dedupe_distance=args.dedupe_distance,
+        dedupe_similarity=args.dedupe_similarity,
+        pdf_dpi=args.pdf_dpi,
+        pdf_workers=args.pdf_workers,
+        pdf_in_flight=args.pdf_in_flight,
+        pdf_profile=args.pdf_profile,
+        pdf_max_bytes=int(args.pdf_max_mb * 1024 * 1024) if args.pdf_max_mb else None
     )
 
     if extractor.extract_slides():
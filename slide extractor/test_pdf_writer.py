@@ -0,0 +1,35 @@
+import multiprocessing
+
+import pytest
+
+from benchmark import _measure_pdf, _synthetic_deck
+
+# Peak RSS a PDF export may reach, the interpreter and its imports included
+MAX_PEAK_MIB = 200
+# Allowed peak RSS growth from 100 to 1,000 slides
+MAX_GROWTH_MIB = 16
+
+
+def _peak_rss_mib(method, image_files, pdf_path):
+    """Build the PDF in a fresh process and return its peak RSS in MiB"""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_measure_pdf, args=(method, {}, image_files, pdf_path, results))
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    _, peak_kib = results.get()
+    return peak_kib / 1024
+
+
+@pytest.fixture(scope="module")
+def deck(tmp_path_factory):
+    return _synthetic_deck(str(tmp_path_factory.mktemp("deck")), 1000, 640)
+
+
+@pytest.mark.parametrize("method", ["streaming", "passthrough", "stacked-passthrough"])
+def test_pdf_export_memory_is_flat(deck, tmp_path, method):
+    small = _peak_rss_mib(method, deck[:100], str(tmp_path / "small.pdf"))
+    large = _peak_rss_mib(method, deck, str(tmp_path / "large.pdf"))
+    assert large < MAX_PEAK_MIB
+    assert large - small < MAX_GROWTH_MIB